@@ -0,0 +1,60 @@
+"""
+Micro-benchmark of the box file reader.
+
+    python benchmarks/bench_load_text.py [result_or_gt_dir] [repeat]
+
+Compares `load_text` (one pass with a sniffed delimiter) with the old
+try-every-delimiter loop, kept as `load_text_numpy(path, delimiter=[...])`, after
+checking that both give the same arrays. The default directory is the bundled
+ground truth of all datasets. Run with the package installed (or `PYTHONPATH=src`).
+"""
+import glob
+import os
+import sys
+import time
+import numpy as np
+import rgbt
+from rgbt.utils import load_text, load_text_numpy
+
+
+default_path = os.path.join(os.path.dirname(rgbt.__file__), 'gt_file')
+result_path = sys.argv[1] if len(sys.argv)>1 else default_path
+repeat = int(sys.argv[2]) if len(sys.argv)>2 else 3
+files = sorted(glob.glob(os.path.join(result_path, '**', '*.txt'), recursive=True))
+
+
+def is_box_file(path):
+    # sequence lists and attribute tables are skipped
+    try:
+        return np.ndim(load_text_numpy(path, delimiter=[',', ' ', '\t'], dtype=np.float32))==2
+    except Exception:
+        return False
+
+
+files = [path for path in files if is_box_file(path)]
+if not files:
+    sys.exit(f"no box files in {result_path}")
+print(f"{len(files)} files in {result_path}")
+
+
+def old_load_text(path):
+    return load_text_numpy(path, delimiter=[',', ' ', '\t'], dtype=np.float32)
+
+
+def bench(fun):
+    best = float('inf')
+    for _ in range(repeat):
+        st = time.perf_counter()
+        for path in files:
+            fun(path)
+        best = min(best, time.perf_counter()-st)
+    return best
+
+
+for path in files:
+    assert np.array_equal(old_load_text(path), load_text(path), equal_nan=True), path
+
+t_old = bench(old_load_text)
+t_new = bench(load_text)
+print(f"try every delimiter: {t_old:.3f}s")
+print(f"sniffed delimiter:   {t_new:.3f}s  ({t_old/max(t_new, 1e-9):.2f}x)")
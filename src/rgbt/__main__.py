@@ -0,0 +1,4 @@
+import sys
+from rgbt.cli import main
+
+sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Sharded evaluation from the command line, with plain files on a shared filesystem.
+
+    rgbt plan --dataset LasHeR --tracker APFNet=./result/LasHeR/APFNet --glob './sweep/*' --shards 8 --out work/plan.json
+    rgbt run work/plan.json --shard 3          # on any host, once per shard
+    rgbt merge work/plan.json --csv scores.csv --plot
+
+`plan` splits the (tracker, sequence) pairs into shards of about the same number of
+frames and writes them to a JSON plan. `run` evaluates every metric of the dataset on
+one shard and writes its `MetricState`s to `shard-<k>.npz` next to the plan (written to a
+temporary file and renamed, so a partial file is never read). `merge` combines the
+shard files into the scores of a single run (see `rgbt.metrics.partial`), prints them and
+writes a CSV and the plots.
+"""
+import os
+import sys
+import csv
+import glob
+import json
+import argparse
+import numpy as np
+
+
+def _datasets():
+    from rgbt import GTOT, RGBT210, RGBT234, LasHeR
+    return {'GTOT': GTOT, 'RGBT210': RGBT210, 'RGBT234': RGBT234, 'LasHeR': LasHeR}
+
+
+def _dataset_metrics(dataset):
+    from rgbt.metrics.compact import dataset_metrics
+    return dataset_metrics(dataset)
+
+
+def split_work(units:list, weights:list, n_shards:int):
+    """
+    Longest job first: every unit goes to the shard with the least weight so far.
+    Returns a list of `n_shards` lists of units, each in the order of `units`.
+    """
+    load = np.zeros(n_shards)
+    owner = np.empty(len(units), dtype=np.int64)
+    for i in np.argsort(-np.asarray(weights, dtype=np.float64), kind='stable'):
+        owner[i] = np.argmin(load)
+        load[owner[i]] += weights[i]
+    return [[unit for unit, k in zip(units, owner) if k==shard] for shard in range(n_shards)]
+
+
+def plan(args):
+    dataset = _datasets()[args.dataset]()
+    trackers = {}
+    for spec in args.tracker or []:
+        name, _, path = spec.partition('=')
+        if not path:
+            raise SystemExit(f"--tracker expects NAME=PATH, got {spec}")
+        trackers[name] = path
+    for pattern in args.glob or []:
+        for path in sorted(glob.glob(pattern)):
+            trackers.setdefault(os.path.basename(os.path.normpath(path)), path)
+    if not trackers:
+        raise SystemExit("no tracker given, use --tracker or --glob")
+
+    metrics = args.metrics or list(_dataset_metrics(dataset))
+    units = [(name, seq_name) for name in trackers for seq_name in dataset.seqs_name]
+    frames = {}
+    for seq_name in dataset.seqs_name:
+        gt = dataset[seq_name]
+        frames[seq_name] = len(gt['visible'] if isinstance(gt, dict) else gt)
+    shards = []
+    for work in split_work(units, [frames[seq_name] for _, seq_name in units], args.shards):
+        shard = {}
+        for name, seq_name in work:
+            shard.setdefault(name, []).append(seq_name)
+        shards.append(shard)
+
+    # the options of every tracker can be edited in the plan before running it
+    plan = {'dataset': args.dataset, 'metrics': metrics, 'shards': shards,
+            'trackers': {name: {'path': os.path.abspath(path), 'bbox_type': args.bbox_type, 'prefix': args.prefix}
+                         for name, path in trackers.items()}}
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(plan, f, indent=1)
+    print(f"{len(units)} (tracker, sequence) pairs of {len(trackers)} trackers in {len(shards)} shards -> {args.out}")
+
+
+def _load_plan(path:str):
+    with open(path) as f:
+        return json.load(f)
+
+
+def shard_path(plan_path:str, shard:int):
+    return os.path.join(os.path.dirname(os.path.abspath(plan_path)), f'shard-{shard}.npz')
+
+
+def run(args):
+    from rgbt.metrics.partial import save_states
+    plan = _load_plan(args.plan)
+    if not 0<=args.shard<len(plan['shards']):
+        raise SystemExit(f"--shard must be in [0, {len(plan['shards'])})")
+    dataset = _datasets()[plan['dataset']]()
+    states = []
+    for name, seqs in plan['shards'][args.shard].items():
+        tracker = plan['trackers'][name]
+        dataset(name, tracker['path'], seqs=seqs, prefix=tracker['prefix'], bbox_type=tracker['bbox_type'])
+        for metric_name in plan['metrics']:
+            states.extend(dataset.partial(getattr(dataset, metric_name), name, seqs, args.workers).values())
+        # one tracker in memory at a time
+        dataset.unregister(name)
+    out = shard_path(args.plan, args.shard)
+    tmp = f'{out}.{os.getpid()}.tmp'
+    save_states(tmp, states)
+    os.replace(tmp, out)
+    print(f"shard {args.shard}: {len(states)} states -> {out}")
+
+
+def merge(args):
+    from rgbt.metrics.partial import load_states, merge_states
+    from rgbt.vis.plot import draw_plot
+    plan = _load_plan(args.plan)
+    paths = [shard_path(args.plan, shard) for shard in range(len(plan['shards']))]
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        raise SystemExit(f"{len(missing)} shards are not done: {', '.join(missing)}")
+    dataset = _datasets()[plan['dataset']]()
+    metrics = _dataset_metrics(dataset)
+    merged = merge_states([state for path in paths for state in load_states(path)])
+
+    scores = {}
+    for metric_name in plan['metrics']:
+        metric = metrics[metric_name]
+        for name in plan['trackers']:
+            state = merged[(type(metric).__name__, name)]
+            if len(state.seqs)!=len(dataset.seqs_name):
+                raise SystemExit(f"{name} {metric_name}: {len(state.seqs)} of {len(dataset.seqs_name)} sequences in the shards")
+            scores.setdefault(name, {})[metric_name] = state.finalize(metric)
+
+    rank = plan['metrics'][0]
+    names = sorted(scores, key=lambda name: scores[name][rank][0], reverse=True)
+    width = max([len('tracker')]+[len(name) for name in names])
+    print(f"{'tracker':{width}} " + ' '.join(f'{m:>8}' for m in plan['metrics']))
+    for name in names:
+        print(f"{name:{width}} " + ' '.join(f'{scores[name][m][0]:8.4f}' for m in plan['metrics']))
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['tracker'] + plan['metrics'])
+            for name in names:
+                writer.writerow([name] + [repr(float(scores[name][m][0])) for m in plan['metrics']])
+    if args.plot:
+        for metric_name in plan['metrics']:
+            setting = getattr(dataset, f'{metric_name}_PlotSetting', None)
+            if setting==None:
+                continue
+            ranked = sorted(names, key=lambda name: scores[name][metric_name][0], reverse=True)
+            draw_plot(result=[[f"{name}[{round(scores[name][metric_name][0], 3)}]", scores[name][metric_name][1].mean(0)]
+                              for name in ranked], setting=setting)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='rgbt', description='Sharded evaluation of RGBT tracking results.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('plan', help='split (tracker, sequence) pairs into shards')
+    p.add_argument('--dataset', required=True, choices=['GTOT', 'RGBT210', 'RGBT234', 'LasHeR'])
+    p.add_argument('--tracker', action='append', metavar='NAME=PATH', help='a result directory or archive, repeatable')
+    p.add_argument('--glob', action='append', metavar='PATTERN', help='result roots named by their basename, repeatable')
+    p.add_argument('--shards', type=int, required=True)
+    p.add_argument('--metrics', nargs='+', help='metric names of the dataset, default all')
+    p.add_argument('--bbox-type', default='ltwh', dest='bbox_type')
+    p.add_argument('--prefix', default='')
+    p.add_argument('--out', default='plan.json')
+    p.set_defaults(fun=plan)
+
+    p = sub.add_parser('run', help='evaluate one shard of a plan')
+    p.add_argument('plan')
+    p.add_argument('--shard', type=int, required=True)
+    p.add_argument('--workers', type=int, default=None, help='processes per metric, see Metric.evaluate')
+    p.set_defaults(fun=run)
+
+    p = sub.add_parser('merge', help='combine the shards into the final scores')
+    p.add_argument('plan')
+    p.add_argument('--csv', help='write the scores to a CSV file')
+    p.add_argument('--plot', action='store_true', help='draw the plots of the dataset metrics')
+    p.set_defaults(fun=merge)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.fun(args)
+    return 0
+
+
+if __name__=='__main__':
+    sys.exit(main())
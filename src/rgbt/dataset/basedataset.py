@@ -1,41 +1,163 @@
 
 from rgbt.utils import *
 import os
+import ast
+import warnings
+from collections import OrderedDict, namedtuple
 from rgbt.vis import draw_radar, draw_plot
+from rgbt.dataset.gt_pack import load_gt_pack
+from rgbt.dataset.ragged import RaggedBoxes, ModalityBoxes
+from rgbt.dataset.result_source import ResultLoadError, DirectorySource, open_result_source, read_result_files
 from rgbt import __file__ as basepath
 _basepath = os.path.dirname(basepath)
 
 
 def initial_gt_file(gt_path:str, seqs:list, v_name:str, i_name:str, bbox_trans):
-    res = {}
-    for seq_name in seqs:
-        serial_v = load_text(os.path.join(gt_path, seq_name, v_name))
-        serial_i = load_text(os.path.join(gt_path, seq_name, i_name))
-        seq_serial = {'visible': serial_process(bbox_trans, serial_v), 'infrared': serial_process(bbox_trans,serial_i)}
-        res[seq_name] = seq_serial
-    return res
+    serial_v = RaggedBoxes.from_arrays(seqs, [load_text(os.path.join(gt_path, seq_name, v_name)) for seq_name in seqs])
+    serial_i = RaggedBoxes.from_arrays(seqs, [load_text(os.path.join(gt_path, seq_name, i_name)) for seq_name in seqs])
+    return ModalityBoxes({'visible': serial_v.map(bbox_trans), 'infrared': serial_i.map(bbox_trans)})
 
 
-def initial_result_file(path:str, seqs:list, bbox_trans, prefix=''):
-    res = {}
-    for seq_name in seqs:
-        serial = load_text(os.path.join(path, prefix+seq_name+'.txt')).round(0)
-        res[seq_name] = serial_process(bbox_trans, serial)
-    return res
+def packed_gt(pack, bbox_trans):
+    """
+    Ground truth of a `GTPack`, the boxes stay a view of the memory-mapped pack when
+    no conversion is needed.
+    """
+    modalities = {m: RaggedBoxes.from_spans(pack.seqs, np.asarray(pack.boxes), pack.spans[m]).map(bbox_trans) for m in pack.modalities()}
+    if tuple(modalities)==('visible', 'infrared'):
+        return ModalityBoxes(modalities)
+    return next(iter(modalities.values()))
+
+
+def initial_result_file(path:str, seqs:list, bbox_trans, prefix='', workers=None, executor='thread', preloaded=None):
+    """
+    Load the result file of every sequence.
+
+    [in] path - str | ResultSource
+        A directory, a `.zip`/`.tar.gz` archive or a `.npz` file, see `rgbt.dataset.result_source`.
+    [in] workers - int
+        Read the files of a directory with a pool of `workers` threads or processes. Default reads
+        serially. Either way, errors are collected for all files and raised together as `ResultLoadError`.
+    [in] executor - str | Executor
+        'thread', 'process' or your own `concurrent.futures.Executor`.
+    [in] preloaded - dict
+        {seq_name: array} already read from the source.
+
+    Returns a `RaggedBoxes`, boxes of all sequences in one (total_frames, 4) array.
+    """
+    if preloaded==None:
+        preloaded = open_result_source(path, prefix).read(seqs, workers, executor)
+    return RaggedBoxes.from_arrays(seqs, [preloaded[seq_name] for seq_name in seqs]).map(bbox_trans)
+
 
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+class LRUResult:
+    """
+    Sequences of a lazy `TrackerResult`, loaded on first access and kept in a
+    least-recently-used cache of at most `maxsize` sequences. `on_evict(seq_name)` is
+    called when a sequence leaves the cache.
+    """
+    def __init__(self, loader, maxsize:int) -> None:
+        if maxsize<1:
+            raise ValueError("cache_size must be at least 1")
+        self.loader = loader
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.on_evict = None
+
+    def __getitem__(self, seq_name):
+        if seq_name in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(seq_name)
+            return self.cache[seq_name]
+        self.misses += 1
+        serial = self.loader(seq_name)
+        self.cache[seq_name] = serial
+        if len(self.cache)>self.maxsize:
+            evicted, _ = self.cache.popitem(last=False)
+            self.evictions += 1
+            if self.on_evict!=None:
+                self.on_evict(evicted)
+        return serial
+
+    def __getstate__(self):
+        # the eviction hook belongs to the memo of a dataset in this process
+        state = self.__dict__.copy()
+        state['on_evict'] = None
+        return state
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self.cache))
+
+    def cache_clear(self):
+        evicted = list(self.cache)
+        self.cache.clear()
+        if self.on_evict!=None:
+            for seq_name in evicted:
+                self.on_evict(seq_name)
+        self.hits = self.misses = self.evictions = 0
 
 
 class TrackerResult:
     """
     Your tracking result.
+
+    With `lazy=True` nothing is read when registering, each sequence is loaded on
+    first access and at most `cache_size` converted sequences are kept in memory.
+
+    With `compact=True` the boxes are stored as int16 when every coordinate is an integer in
+    the int16 range (see `RaggedBoxes.compact`) and converted back to float32 per sequence, the
+    scores do not change. Other results stay float32, with a warning. A lazy result is not
+    compacted, `cache_size` bounds its memory instead, and `compact=True` warns.
+    Use `rgbt.metrics.compact_report` to compare with a float64 evaluation.
     """
-    def __init__(self, tracker_name, path:str, seqs:list, prefix:str, bbox_type:str) -> None:
+    def __init__(self, tracker_name, path:str, seqs:list, prefix:str, bbox_type:str, workers=None, executor='thread', preloaded=None,
+                 lazy=False, cache_size=64, strict=None, compact=False) -> None:
         self.tracker_name = tracker_name
         self.seqs_name = seqs
-        self.bbox_transfun = bbox_type_trans(bbox_type, 'ltwh')
-        self.seqs_result = initial_result_file(path, seqs, self.bbox_transfun, prefix)
+        self.path = path
+        self.prefix = prefix
+        self.source = open_result_source(path, prefix)
+        # bind the pixel convention of the dataset, a lazy sequence is converted later
+        self.bbox_transfun = bbox_array_trans(bbox_type, 'ltwh', strict=is_strict() if strict==None else strict)
+        if lazy:
+            self.seqs_result = LRUResult(self._load_sequence, cache_size)
+            if compact:
+                warnings.warn(f"{tracker_name}: compact=True is ignored with lazy=True, the boxes are cached as float32")
+        else:
+            self.seqs_result = initial_result_file(self.source, seqs, self.bbox_transfun, prefix, workers, executor, preloaded)
+            if compact:
+                self.seqs_result = self.seqs_result.compact()
+                if not self.seqs_result.is_compact:
+                    warnings.warn(f"{tracker_name}: boxes kept as {self.seqs_result.dtype}, not every coordinate is an integer in the int16 range")
         self.bbox_type = 'ltwh'
 
+    def _load_sequence(self, seq_name):
+        return self.bbox_transfun(self.source.read_one(seq_name))
+
+    def cache_info(self):
+        """
+        Hit, miss and eviction counters of a lazy result, None when loaded eagerly.
+        """
+        if isinstance(self.seqs_result, LRUResult):
+            return self.seqs_result.cache_info()
+        return None
+
+    def set_box(self, seq_name, i:int, box):
+        """
+        Overwrite box `i` of a sequence in the stored boxes, return the boxes of the sequence.
+        """
+        if isinstance(self.seqs_result, RaggedBoxes):
+            self.seqs_result.set_box(seq_name, i, box)
+        else:
+            self.seqs_result[seq_name][i] = box
+        return self.seqs_result[seq_name]
+
     def __getitem__(self, index):
         if isinstance(index, int):
             return self.seqs_result[self.seqs_name[index]]
@@ -52,7 +174,10 @@ class BaseRGBTDataet:
     """
     ground truth.
     """
-    def __init__(self, gt_path:str, seqs:list, bbox_type:str, v_name=None, i_name=None) -> None:
+    convention = STRICT     # pixel convention of the dataset, see `rgbt.utils.BoxConvention`
+
+    def __init__(self, gt_path:str, seqs:list, bbox_type:str, v_name=None, i_name=None, use_pack=True, pack_dir=None,
+                 convention:BoxConvention=None) -> None:
         """
         [in] gt_path - str
             The ground truth file path.
@@ -66,20 +191,80 @@ class BaseRGBTDataet:
             The ground truth file name of visible images.
         [in] i_name - str
             The ground truth file name of infrared images.
+        [in] use_pack - bool
+            Load the ground truth and attributes from a binary pack (see `rgbt.dataset.gt_pack`),
+            it is built on first use and rebuilt when the text files change.
+        [in] pack_dir - str
+            Where to keep the pack, default is next to the ground truth files.
+        [in] convention - BoxConvention
+            Pixel convention of the box conversions and the metrics, default is the one of the dataset class.
         """
         self.gt_path = gt_path
+        if convention!=None:
+            self.convention = convention
 
-        self.bbox_transfun = bbox_type_trans(bbox_type, 'ltwh')
+        self.bbox_transfun = bbox_array_trans(bbox_type, 'ltwh', strict=self.convention.load_strict)
         self.bbox_type = 'ltwh'
 
         self.seqs_name = seqs
         self.ALL = tuple(self.seqs_name)
-        if v_name!=None and i_name!=None:
-            self.seqs_gt = initial_gt_file(self.gt_path, seqs, v_name, i_name, self.bbox_transfun)    # ground truth
+        if use_pack:
+            if v_name!=None and i_name!=None:
+                sources = {'visible': [os.path.join(self.gt_path, seq_name, v_name) for seq_name in seqs],
+                           'infrared': [os.path.join(self.gt_path, seq_name, i_name) for seq_name in seqs]}
+            else:
+                sources = {'gt': [os.path.join(self.gt_path, seq_name+'.txt') for seq_name in seqs]}
+            self.pack = load_gt_pack(seqs, sources, attr_names=self.get_attr_list(), attr_files=self._attr_files(),
+                                     attr_reader=self._read_attr_table, pack_dir=pack_dir)
+            self.seqs_gt = packed_gt(self.pack, self.bbox_transfun)    # ground truth
+            self._attr_table = np.asarray(self.pack.attrs)
         else:
-            self.seqs_gt = initial_result_file(self.gt_path, self.seqs_name, self.bbox_transfun, prefix='')
+            self.pack = None
+            if v_name!=None and i_name!=None:
+                self.seqs_gt = initial_gt_file(self.gt_path, seqs, v_name, i_name, self.bbox_transfun)    # ground truth
+            else:
+                self.seqs_gt = initial_result_file(self.gt_path, self.seqs_name, self.bbox_transfun, prefix='')
+            self._attr_table = self._read_attr_table()
+        # sequence x attribute membership, see `select`
+        self.attr_matrix = self._attr_membership(self._attr_table)
+        self._attr_index = {attr:i for i,attr in enumerate(self.get_attr_list() or ())}
 
         self.trackers = {}
+        self.metric_cache = None    # a `rgbt.metrics.MetricCache` to reuse per-sequence metric states
+        self._score_memo = {}       # {tracker_name: (TrackerResult, {key: per-frame scores})}, see `frame_scores`
+        self._gt_invalid = None     # see `gt_invalid`
+        self._shared_gt = None      # see `share_gt`
+
+
+    def __getstate__(self):
+        # sent to worker processes: the memo stays here and a packed ground truth
+        # travels as the pack path, it is mapped again on the other side
+        state = self.__dict__.copy()
+        state['_score_memo'] = {}
+        shared = state.get('_shared_gt')
+        if shared!=None and not shared.closed:
+            # the ground truth, invalid frames and attributes are attached by the block name
+            del state['seqs_gt'], state['attr_matrix']
+            state['_gt_invalid'] = None
+            state['pack'] = None
+            return state
+        state['_shared_gt'] = None
+        if self.pack!=None and self.pack.path!=None:
+            del state['seqs_gt']
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        shared = state.get('_shared_gt')
+        if 'seqs_gt' in state:
+            return
+        if shared!=None:
+            self.seqs_gt = shared.gt()
+            self._gt_invalid = shared.invalid()
+            self.attr_matrix = shared.attr_matrix
+        else:
+            self.seqs_gt = packed_gt(self.pack, self.bbox_transfun)
 
 
     def __len__(self):
@@ -95,28 +280,249 @@ class BaseRGBTDataet:
             raise KeyError
 
 
-    def __call__(self, tracker_name, result_path:str, seqs=None, prefix='', bbox_type='ltwh') -> TrackerResult:
+    def __call__(self, tracker_name, result_path:str, seqs=None, prefix='', bbox_type='ltwh', **argdict) -> TrackerResult:
         """
         Return the tracker result instance.
+        `workers` and `executor` are passed to `TrackerResult` to read the files concurrently.
         """
         if seqs==None:
             seqs=self.seqs_name
-        self.trackers[tracker_name] = TrackerResult(tracker_name, result_path, seqs, prefix, bbox_type)
+        self.trackers[tracker_name] = TrackerResult(tracker_name, result_path, seqs, prefix, bbox_type,
+                                                    strict=self.convention.load_strict, **argdict)
+        self._score_memo.pop(tracker_name, None)
         return self.trackers[tracker_name]
 
 
+    def share_gt(self):
+        """
+        Publish the ground truth, the invalid frames and the attribute matrix in shared memory,
+        see `rgbt.dataset.shared_gt`. Until the block is removed, worker processes receive the
+        dataset without them and attach to the block instead.
+
+        Returns
+        -------
+        The `SharedGT`, remove it with `unshare_gt` or use it in a `with` statement.
+        """
+        from .shared_gt import SharedGT
+        self.unshare_gt()
+        self._shared_gt = SharedGT.publish(self)
+        return self._shared_gt
+
+
+    def unshare_gt(self):
+        """
+        Remove the shared memory block of `share_gt`, if any.
+        """
+        shared = getattr(self, '_shared_gt', None)
+        if shared!=None:
+            shared.unlink()
+        self._shared_gt = None
+
+
+    def unregister(self, tracker_name):
+        """
+        Drop a tracker and its memoized scores.
+        """
+        self._score_memo.pop(tracker_name, None)
+        return self.trackers.pop(tracker_name)
+
+
+    def frame_scores(self, result:TrackerResult, seq_name, key:tuple, compute):
+        """
+        Per-frame scores (IoU, CLE, ...) of one sequence, computed once and shared by all
+        metrics, attribute subsets, radar charts and plots. The memo of a tracker is
+        dropped when it is registered again. For a lazy tracker only the sequences in its
+        result cache are memoized, their scores are dropped with their boxes.
+
+        [in] key - tuple
+            What the scores depend on besides the tracker and the sequence, e.g.
+            (kernel name, modality, variant, pixel convention).
+        [in] compute - callable
+            Returns the scores when they are not memoized yet.
+        """
+        memo = self._score_memo.get(result.tracker_name)
+        if memo==None or memo[0] is not result:
+            memo = self._score_memo[result.tracker_name] = (result, {})
+            if isinstance(result.seqs_result, LRUResult):
+                result.seqs_result.on_evict = lambda evicted: self.forget_scores(result, evicted)
+        key = (seq_name,) + tuple(key)
+        scores = memo[1].get(key)
+        if scores is None:
+            scores = compute()
+            if not isinstance(result.seqs_result, LRUResult) or seq_name in result.seqs_result.cache:
+                memo[1][key] = scores
+        return scores
+
+
+    def gt_invalid(self, seq_name):
+        """
+        Mask of the frames whose ground truth has a value <= 0 (the visible one for two modalities),
+        computed once for the whole dataset. The LasHeR metrics do not score these frames.
+        """
+        if self._gt_invalid==None:
+            gt = self.seqs_gt.modalities['visible'] if isinstance(self.seqs_gt, ModalityBoxes) else self.seqs_gt
+            self._gt_invalid = RaggedBoxes(gt.seqs, (gt.boxes<=0).any(axis=1), gt.offsets)
+        return self._gt_invalid[seq_name]
+
+
+    def has_frame_scores(self, result:TrackerResult, seq_name, key:tuple):
+        memo = self._score_memo.get(result.tracker_name)
+        return memo!=None and memo[0] is result and (seq_name,)+tuple(key) in memo[1]
+
+
+    def memo_scores(self, result:TrackerResult, seqs:list):
+        """
+        The memoized scores of some sequences of a tracker, {(seq_name, *key): scores}.
+        """
+        memo = self._score_memo.get(result.tracker_name)
+        if memo==None or memo[0] is not result:
+            return {}
+        seqs = set(seqs)
+        return {key: scores for key, scores in memo[1].items() if key[0] in seqs}
+
+
+    def forget_scores(self, result:TrackerResult, seq_name=None):
+        """
+        Drop the memoized scores of one sequence (or all) of a tracker, e.g. after its boxes changed.
+        """
+        memo = self._score_memo.get(result.tracker_name)
+        if memo==None or memo[0] is not result:
+            return
+        if seq_name==None:
+            del self._score_memo[result.tracker_name]
+        else:
+            for key in [key for key in memo[1] if key[0]==seq_name]:
+                del memo[1][key]
+
+
+    def register(self, trackers:list, workers=None, executor='thread') -> dict:
+        """
+        Register several trackers at once, the files of all trackers are read by one pool.
+
+        [in] trackers - list
+            Keyword dicts of `__call__`, e.g. [{'tracker_name': 'APFNet', 'result_path': '...', 'bbox_type': 'corner'}, ...]
+        [in] workers, executor
+            See `initial_result_file`. Errors of all trackers are raised together as `ResultLoadError`.
+
+        Returns
+        -------
+        {tracker_name: TrackerResult} in the given order.
+        """
+        # files of all directory sources go through one pool, an archive is read in one sweep
+        tasks = []
+        preloaded = {}
+        errors = {}
+        for t in trackers:
+            seqs = t.get('seqs') if t.get('seqs') is not None else self.seqs_name
+            source = open_result_source(t['result_path'], t.get('prefix', ''))
+            if isinstance(source, DirectorySource):
+                tasks += [(t['tracker_name'], seq_name, source.file_path(seq_name)) for seq_name in seqs]
+            else:
+                try:
+                    preloaded[t['tracker_name']] = source.read(seqs)
+                except ResultLoadError as e:
+                    errors.update(e.errors)
+        try:
+            serials = read_result_files([p for _,_,p in tasks], workers, executor)
+        except ResultLoadError as e:
+            errors.update(e.errors)
+        if errors:
+            raise ResultLoadError(errors)
+
+        for (tracker_name, seq_name, _), serial in zip(tasks, serials):
+            preloaded.setdefault(tracker_name, {})[seq_name] = serial
+        res = {}
+        for t in trackers:
+            res[t['tracker_name']] = self(**t, preloaded=preloaded[t['tracker_name']])
+        return res
+
+
     def choose_serial_by_att(self, attr):
-        raise ImportError
+        if attr==self.ALL:
+            return self.seqs_name
+        else:
+            p = self.attr_matrix[:, self._attr_index[attr]]
+            return [seq_name for i,seq_name in zip(p, self.seqs_name) if i]
+
+
+    def select(self, expr:str, as_index=False):
+        """
+        Choose the sequences matching a boolean expression of challenge attributes.
+
+        [in] expr - str
+            Attribute names combined with `&` (and), `|` (or), `^` (xor), `~` (not) and
+            parentheses, `and`/`or`/`not` also work. `ALL` is every sequence.
+            e.g. "TC & FM & ~LI", "(LI | TC) & ~ALL".
+        [in] as_index - bool
+            Return the sequence indices (ndarray) instead of the names.
+        """
+        try:
+            node = ast.parse(expr, mode='eval').body
+        except SyntaxError as e:
+            raise ValueError(f"Invalid attribute expression: {expr!r}") from e
+        mask = np.broadcast_to(self._eval_attr_expr(node, expr), (len(self.seqs_name),))
+        index = np.flatnonzero(mask)
+        if as_index:
+            return index
+        return [self.seqs_name[i] for i in index]
+
+
+    def _eval_attr_expr(self, node, expr):
+        if isinstance(node, ast.Name):
+            if node.id=='ALL':
+                return np.ones(len(self.seqs_name), dtype=bool)
+            if node.id not in self._attr_index:
+                raise ValueError(f"Unknown attribute {node.id!r} in {expr!r}, choose from {self.get_attr_list()}")
+            return self.attr_matrix[:, self._attr_index[node.id]]
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Invert, ast.Not)):
+            return ~self._eval_attr_expr(node.operand, expr)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.BitAnd, ast.BitOr, ast.BitXor)):
+            left = self._eval_attr_expr(node.left, expr)
+            right = self._eval_attr_expr(node.right, expr)
+            if isinstance(node.op, ast.BitAnd):
+                return left & right
+            if isinstance(node.op, ast.BitOr):
+                return left | right
+            return left ^ right
+        if isinstance(node, ast.BoolOp):
+            values = [self._eval_attr_expr(v, expr) for v in node.values]
+            return np.logical_and.reduce(values) if isinstance(node.op, ast.And) else np.logical_or.reduce(values)
+        raise ValueError(f"Unsupported syntax in attribute expression: {expr!r}")
 
 
     def get_attr_list(self) -> Union[tuple, list]:
         raise ImportError
 
 
-    def draw_attributeRadar(self, metric_fun, filename, **argdict):
+    def _attr_files(self) -> list:
+        """
+        Text files the attribute table is read from.
+        """
+        return []
+
+
+    def _read_attr_table(self):
+        """
+        Read the attribute table from the text files, shape (len(seqs), len(attr_list)).
+        """
+        return np.zeros((len(self.seqs_name), 0), dtype=np.float32)
+
+
+    def _attr_membership(self, table):
+        """
+        Boolean membership matrix from the attribute table.
+        """
+        return np.asarray(table)!=0
+
+
+    def draw_attributeRadar(self, metric_fun, filename, workers=None, **argdict):
         """
         Draw a radar chart with all challenge attributes.
+        With `workers`, the per-frame scores of all sequences are first computed by a
+        process pool, the attribute subsets are then counted from the memo.
         """
+        if workers!=None:
+            metric_fun(seqs=self.ALL, workers=workers)
         result = [[tracker_name, []] for tracker_name in self.trackers.keys()]
         for attr in self.get_attr_list():
             dict = metric_fun(seqs=getattr(self, attr))
@@ -126,12 +532,12 @@ class BaseRGBTDataet:
         draw_radar(result=result, attrs=self.get_attr_list(), fn=filename, **argdict)
 
 
-    def plot(self, metric_fun, plotSetting, seqs=None, rank="descend", **argdict):
+    def plot(self, metric_fun, plotSetting, seqs=None, rank="descend", workers=None, **argdict):
         if seqs==None:
             seqs = self.ALL
         
         result = [[tracker_name, []] for tracker_name in self.trackers.keys()]
-        dict = metric_fun(seqs=seqs)
+        dict = metric_fun(seqs=seqs, workers=workers)
         vals = []
         for i,(k,v) in enumerate(dict.items()):
             vals.append(v[0])
@@ -143,4 +549,145 @@ class BaseRGBTDataet:
             idx = sorted(range(len(vals)), key=lambda x:vals[x], reverse=False)
         result = [result[i] for i in idx]
         
-        draw_plot(result=result, setting=plotSetting)
\ No newline at end of file
+        draw_plot(result=result, setting=plotSetting)
+
+
+    def metric_of(self, metric_fun):
+        """
+        The `Metric` behind a metric method, e.g. `metric_of(self.MPR)` is `self.MPR_fun`.
+        """
+        return getattr(self, metric_fun.__name__+'_fun')
+
+
+    def bootstrap(self, metric_fun, tracker_name=None, seqs=None, n_boot=10000, alpha=0.05, seed=0, workers=None):
+        """
+        Confidence intervals by resampling the sequences with replacement, see `rgbt.metrics.stats`.
+
+        [in] metric_fun - method
+            A metric of the dataset, e.g. `rgbt234.MPR`.
+        [in] n_boot - int
+            Number of resamples, all trackers are resampled with the same draws.
+        [in] alpha - float
+            The interval is the alpha/2 and 1-alpha/2 quantile of the resampled values.
+        [in] seed - int
+            Seed of the draws.
+
+        Returns
+        -------
+        {tracker_name: (value, low, high)}
+        """
+        from rgbt.metrics.stats import metric_bootstrap
+        if seqs==None:
+            seqs = self.seqs_name
+        metric = self.metric_of(metric_fun)
+        results = self.trackers if tracker_name==None else {tracker_name: self.trackers[tracker_name]}
+        states = metric.evaluate_states(self, results, seqs, workers)
+        return metric_bootstrap(metric, states, n_boot, alpha, seed)
+
+
+    def significance(self, metric_fun, tracker_names=None, seqs=None, test='permutation', n_perm=10000, seed=0, alternative='two-sided', workers=None):
+        """
+        Paired tests of every pair of trackers on the same sequences, see `rgbt.metrics.stats`.
+
+        [in] metric_fun - method
+            A metric of the dataset, e.g. `rgbt234.MPR`.
+        [in] tracker_names - list
+            Default is all registered trackers.
+        [in] test - str
+            'permutation' swaps the two trackers per sequence and compares the metric values,
+            'sign_flip' flips the signs of the per-sequence score differences.
+        [in] n_perm - int
+            Number of random swaps/flips.
+        [in] alternative - str
+            'two-sided', 'greater' (row tracker better) or 'less'.
+
+        Returns
+        -------
+        (tracker_names, diff, p), diff[i, j] is the value of tracker i minus tracker j and p[i, j] its p-value.
+        """
+        from rgbt.metrics.stats import metric_significance
+        if seqs==None:
+            seqs = self.seqs_name
+        if tracker_names==None:
+            tracker_names = list(self.trackers)
+        metric = self.metric_of(metric_fun)
+        states = metric.evaluate_states(self, {name: self.trackers[name] for name in tracker_names}, seqs, workers)
+        return metric_significance(metric, states, test, n_perm, seed, alternative)
+
+
+    def temporal(self, metric_fun, tracker_name=None, seqs=None, thr=None, window=30, k=10):
+        """
+        Per-frame timelines, failure events and recovery of the trackers, see `rgbt.metrics.temporal`.
+
+        [in] metric_fun - method
+            A metric of the dataset giving the per-frame values, e.g. `lasher.SR` (IoU) or `lasher.PR` (center error).
+        [in] thr - float
+            Success threshold of a frame, default the one of the metric's reported value (`Metric.value_thr`).
+        [in] window - int
+            Frames of the sliding success/precision rate.
+        [in] k - int
+            A failure event is at least k consecutive lost frames.
+
+        Returns
+        -------
+        {tracker_name: Timeline}
+        """
+        from rgbt.metrics.temporal import temporal_analysis
+        if seqs==None:
+            seqs = self.seqs_name
+        results = self.trackers if tracker_name==None else {tracker_name: self.trackers[tracker_name]}
+        return temporal_analysis(self.metric_of(metric_fun), self, results, seqs, thr, window, k)
+
+
+    def partial(self, metric_fun, tracker_name=None, seqs=None, workers=None):
+        """
+        Mergeable states of a metric on some sequences, see `rgbt.metrics.partial`.
+
+        [in] metric_fun - method
+            A metric of the dataset, e.g. `lasher.PR`.
+        [in] seqs - list
+            The shard of sequences, default all.
+
+        Returns
+        -------
+        {tracker_name: MetricState}
+        """
+        from rgbt.metrics.partial import MetricState
+        if seqs==None:
+            seqs = self.seqs_name
+        metric = self.metric_of(metric_fun)
+        results = self.trackers if tracker_name==None else {tracker_name: self.trackers[tracker_name]}
+        states = metric.evaluate_states(self, results, seqs, workers)
+        return {name: MetricState.from_counts(metric, self, name, counts, frames, seqs) for name, (counts, frames) in states.items()}
+
+
+    def stream(self, metrics=None, bbox_type='ltwh'):
+        """
+        A `StreamingEvaluator` of the dataset, fed with the boxes of a running tracker.
+
+        [in] metrics - str | list
+            Names of the metrics to follow, e.g. 'PR' or ['PR', 'SR'], default all.
+        [in] bbox_type - str
+            Type of the pushed boxes.
+        """
+        from rgbt.metrics.streaming import StreamingEvaluator
+        return StreamingEvaluator(self, metrics, bbox_type)
+
+
+    def sweep(self, roots, metrics=None, prefix='', bbox_type='ltwh', csv_path=None, workers=None, keep_states=True, rank_by=None):
+        """
+        Score many result directories (checkpoints) without registering them, see `rgbt.metrics.sweep`.
+
+        [in] roots - str | list
+            A glob pattern, e.g. './ckpt/epoch_*', or a list of result roots.
+        [in] csv_path - str
+            A ranked CSV rewritten after every checkpoint.
+        [in] workers - int
+            Processes loading and scoring the checkpoints.
+
+        Returns
+        -------
+        A `Sweep` with the values and the per-sequence counts of every checkpoint.
+        """
+        from rgbt.metrics.sweep import sweep_checkpoints
+        return sweep_checkpoints(self, roots, metrics, prefix, bbox_type, csv_path, workers, keep_states, rank_by)
\ No newline at end of file
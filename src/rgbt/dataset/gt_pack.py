@@ -0,0 +1,277 @@
+"""
+Binary ground truth pack.
+
+Parsing the bundled ground truth text files is the dominant cost of building a
+dataset. A pack stores all boxes of one dataset in a single contiguous `.npy`
+array (memory-mapped on load) together with a json manifest holding the
+per-sequence spans, the attribute table and the size/mtime/crc32 of every
+source file. The pack is rebuilt automatically when any source file changes.
+"""
+import os
+import json
+import zlib
+import hashlib
+import tempfile
+import numpy as np
+from rgbt.utils import load_text
+
+
+PACK_VERSION = 1
+PACK_DIR_ENV = 'RGBT_PACK_DIR'
+
+
+def _file_crc32(path:str):
+    with open(path, 'rb') as f:
+        return zlib.crc32(f.read())
+
+
+def _file_stat(path:str):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _write_manifest(path:str, manifest:dict):
+    fd, tmp_json = tempfile.mkstemp(suffix='.json', dir=os.path.dirname(path))
+    with os.fdopen(fd, 'w') as f:
+        json.dump(manifest, f)
+    os.chmod(tmp_json, 0o644)
+    os.replace(tmp_json, path)
+
+
+def _pack_key(root:str, seqs:list, sources:dict, attr_names, attr_files:list):
+    h = hashlib.sha1()
+    h.update(str(PACK_VERSION).encode())
+    h.update('\n'.join(seqs).encode())
+    for modality, files in sources.items():
+        h.update(modality.encode())
+        h.update('\n'.join(os.path.relpath(p, root) for p in files).encode())
+    h.update(repr(tuple(attr_names or ())).encode())
+    h.update('\n'.join(os.path.relpath(p, root) for p in attr_files).encode())
+    return f"{os.path.basename(os.path.normpath(root))}-{h.hexdigest()[:12]}"
+
+
+def _writable_dir(path:str):
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        return False
+    return os.access(path, os.W_OK)
+
+
+def default_pack_dirs(root:str):
+    """
+    Directories searched for a pack, in order. The first writable one is used
+    when a pack has to be (re)built.
+    """
+    dirs = []
+    if os.environ.get(PACK_DIR_ENV):
+        dirs.append(os.environ[PACK_DIR_ENV])
+    dirs.append(os.path.join(root, '.pack'))
+    dirs.append(os.path.join(os.path.expanduser('~'), '.cache', 'rgbt', 'pack'))
+    return dirs
+
+
+class GTPack:
+    """
+    Memory-mapped ground truth of one dataset.
+
+    [in] boxes - ndarray
+        All boxes of the dataset, shape (rows, cols), in the raw format of the text files.
+    [in] spans - dict
+        {modality: [(start, stop), ...]}, one span per sequence in `seqs` order.
+    [in] attrs - ndarray
+        Attribute table of shape (len(seqs), len(attr_names)).
+    [in] path, root - str
+        Where the pack is stored and the root of its sources. A pack with a path pickles
+        as the path only and is opened again when unpickled.
+    """
+    def __init__(self, boxes, spans:dict, seqs:list, attrs, attr_names, manifest:dict, path=None, root=None) -> None:
+        self.path = path
+        self.root = root
+        self.boxes = boxes
+        self.spans = spans
+        self.seqs = list(seqs)
+        self.attrs = attrs
+        self.attr_names = tuple(attr_names or ())
+        self.manifest = manifest
+        self._index = {seq_name:i for i,seq_name in enumerate(self.seqs)}
+
+
+    def __getstate__(self):
+        if self.path==None:
+            return self.__dict__
+        return {'path': self.path, 'root': self.root}
+
+
+    def __setstate__(self, state):
+        if 'boxes' in state:
+            self.__dict__.update(state)
+            return
+        pack = GTPack.open(state['path'], state['root'])
+        if pack==None:
+            raise RuntimeError(f"The ground truth pack {state['path']} changed or disappeared.")
+        self.__dict__.update(pack.__dict__)
+
+
+    def modalities(self):
+        return tuple(self.spans.keys())
+
+
+    def sequence(self, seq_name, modality:str):
+        """
+        Return the raw boxes of one sequence as a view of the pack array.
+        """
+        start, stop = self.spans[modality][self._index[seq_name]]
+        return self.boxes[start:stop]
+
+
+    @staticmethod
+    def build(path:str, root:str, seqs:list, sources:dict, attr_names=None, attr_files=(), attr_reader=None):
+        """
+        Parse the text sources once and write the pack to `path` (`.npy` + `.json`).
+
+        [in] sources - dict
+            {modality: [file of each sequence]}. The same file may be shared by
+            several modalities, it is stored only once.
+        [in] attr_reader - callable
+            Returns the attribute table of shape (len(seqs), len(attr_names)).
+        """
+        rows = []
+        file_spans = {}
+        start = 0
+        ncols = None
+        for modality, files in sources.items():
+            for p in files:
+                if p in file_spans:
+                    continue
+                box = load_text(p)
+                box = box.reshape(-1, box.shape[-1]) if box.ndim else box.reshape(1, 1)
+                if ncols is None:
+                    ncols = box.shape[1]
+                elif box.shape[1]!=ncols:
+                    raise ValueError(f'Can not pack {p}: {box.shape[1]} columns, expect {ncols}.')
+                rows.append(box)
+                file_spans[p] = (start, start+len(box))
+                start += len(box)
+        boxes = np.concatenate(rows, axis=0) if rows else np.zeros((0, 4), dtype=np.float32)
+
+        attrs = np.asarray(attr_reader(), dtype=np.float32) if attr_reader!=None else np.zeros((len(seqs), 0), dtype=np.float32)
+
+        files = []
+        for p in list(file_spans.keys()) + list(attr_files):
+            size, mtime = _file_stat(p)
+            files.append([os.path.relpath(p, root), size, mtime, _file_crc32(p)])
+
+        manifest = {
+            'version': PACK_VERSION,
+            'seqs': list(seqs),
+            'spans': {modality: [file_spans[p] for p in files_] for modality, files_ in sources.items()},
+            'attr_names': list(attr_names or ()),
+            'attrs': attrs.tolist(),
+            'dtype': str(boxes.dtype),
+            'shape': list(boxes.shape),
+            'boxes_sha1': hashlib.sha1(np.ascontiguousarray(boxes).tobytes()).hexdigest(),
+            'files': files,
+        }
+
+        # write to temporary files first, the json appears last and marks a complete pack
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_npy = tempfile.mkstemp(suffix='.npy', dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, boxes)
+        os.chmod(tmp_npy, 0o644)
+        os.replace(tmp_npy, path+'.npy')
+        _write_manifest(path+'.json', manifest)
+
+        return GTPack(boxes, manifest['spans'], seqs, attrs, attr_names, manifest, path, root)
+
+
+    @staticmethod
+    def open(path:str, root:str, verify=False):
+        """
+        Open a pack if it exists and is up to date with its sources, else return None.
+
+        The check only stats the sources. When the mtime of a source changed but
+        the size did not (e.g. a fresh install of a prebuilt pack), the crc32 is
+        compared instead and the manifest is refreshed if possible.
+        Set `verify` to also check the checksum of the packed boxes.
+        """
+        if not (os.path.isfile(path+'.json') and os.path.isfile(path+'.npy')):
+            return None
+        try:
+            with open(path+'.json') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('version')!=PACK_VERSION:
+            return None
+
+        touched = False
+        for item in manifest['files']:
+            p = os.path.join(root, item[0])
+            try:
+                size, mtime = _file_stat(p)
+            except OSError:
+                return None
+            if size!=item[1]:
+                return None
+            if mtime!=item[2]:
+                if _file_crc32(p)!=item[3]:
+                    return None
+                item[2] = mtime
+                touched = True
+
+        try:
+            boxes = np.load(path+'.npy', mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        if list(boxes.shape)!=manifest['shape'] or str(boxes.dtype)!=manifest['dtype']:
+            return None
+        if verify and hashlib.sha1(np.ascontiguousarray(boxes).tobytes()).hexdigest()!=manifest['boxes_sha1']:
+            return None
+
+        if touched and os.access(os.path.dirname(path), os.W_OK):
+            _write_manifest(path+'.json', manifest)
+
+        attrs = np.asarray(manifest['attrs'], dtype=np.float32).reshape(len(manifest['seqs']), len(manifest['attr_names']))
+        return GTPack(boxes, manifest['spans'], manifest['seqs'], attrs, manifest['attr_names'], manifest, path, root)
+
+
+def load_gt_pack(seqs:list, sources:dict, attr_names=None, attr_files=(), attr_reader=None, pack_dir=None, verify=False):
+    """
+    Open the pack of a dataset, building it first if it is missing or stale.
+
+    [in] pack_dir - str
+        Where to keep the pack. Default searches `$RGBT_PACK_DIR`, `<dataset>/.pack`
+        and `~/.cache/rgbt/pack`.
+    """
+    seqs = list(seqs)
+    attr_files = list(attr_files)
+    all_files = [p for files in sources.values() for p in files] + attr_files
+    root = os.path.commonpath([os.path.abspath(p) for p in all_files]) if len(all_files)>1 else os.path.dirname(os.path.abspath(all_files[0]))
+    sources = {modality: [os.path.abspath(p) for p in files] for modality, files in sources.items()}
+    attr_files = [os.path.abspath(p) for p in attr_files]
+    key = _pack_key(root, seqs, sources, attr_names, attr_files)
+
+    dirs = [pack_dir] if pack_dir!=None else default_pack_dirs(root)
+    for d in dirs:
+        pack = GTPack.open(os.path.join(d, key), root, verify=verify)
+        if pack!=None:
+            return pack
+
+    for d in dirs:
+        if _writable_dir(d):
+            return GTPack.build(os.path.join(d, key), root, seqs, sources, attr_names, attr_files, attr_reader)
+
+    # nowhere to write, still return an in-memory pack
+    with tempfile.TemporaryDirectory() as d:
+        pack = GTPack.build(os.path.join(d, key), root, seqs, sources, attr_names, attr_files, attr_reader)
+    pack.path = None
+    return pack
+
+
+if __name__ == '__main__':
+    # Build the packs of the bundled datasets, e.g. to ship them prebuilt.
+    from rgbt import GTOT, RGBT210, RGBT234, LasHeR
+    for dataset in (GTOT, RGBT210, RGBT234, LasHeR):
+        dataset()
@@ -13,10 +13,14 @@ class GTOT(BaseRGBTDataet):
 
     NOTE: this is not support attribute test. [Just here, not GTOT]
     """
+    convention = LOOSE     # the GTOT toolkit converts and measures boxes loosely
+
     def __init__(self, gt_path=f"{_basepath}/gt_file/GTOT/groundtruth/",
-                 seq_name_path=f"{_basepath}/gt_file/GTOT/SequencesName.txt") -> None:
+                 seq_name_path=f"{_basepath}/gt_file/GTOT/SequencesName.txt", convention=None) -> None:
         seqs = load_text(seq_name_path, dtype=str)
-        super().__init__(gt_path=gt_path, seqs=seqs, bbox_type='ltrb', v_name='groundTruth_v.txt', i_name='groundTruth_i.txt')
+        # Challenge attributes
+        self._attr_list = (None)
+        super().__init__(gt_path=gt_path, seqs=seqs, bbox_type='ltrb', v_name='groundTruth_v.txt', i_name='groundTruth_i.txt', convention=convention)
         # super().__init__(gt_path=gt_path, seqs=seqs, bbox_type='ltwh', v_name='init.txt', i_name='init.txt')
 
         self.name = 'GTOT'
@@ -31,16 +35,13 @@ class GTOT(BaseRGBTDataet):
         self.MSR_PlotSetting.axis = self.MSR_fun.thr
         self.MSR_PlotSetting.filename = self.name+"_MSR_plot.png"
 
-        # Challenge attributes
-        self._attr_list = (None)
-
     def get_attr_list(self):
         return self._attr_list
 
     def choose_serial_by_att(self, attr):
         return None
 
-    def MPR(self, tracker_name:Any=None, seqs=None):
+    def MPR(self, tracker_name:Any=None, seqs=None, workers=None):
         """
         Parameters
         ----------
@@ -48,6 +49,8 @@ class GTOT(BaseRGBTDataet):
             Default is None, evaluate all registered trackers.
         [in] seqs - list
             Sequence to be evaluated, default is all.
+        [in] workers - int
+            Evaluate with a pool of processes, see `Metric.evaluate`.
         
         Returns
         -------
@@ -58,15 +61,14 @@ class GTOT(BaseRGBTDataet):
             seqs = self.seqs_name
 
         if tracker_name!=None:
-            return self.MPR_fun(self, self.trackers[tracker_name], seqs)
+            if workers==None:
+                return self.MPR_fun(self, self.trackers[tracker_name], seqs)
+            return self.MPR_fun.evaluate(self, {tracker_name: self.trackers[tracker_name]}, seqs, workers)[tracker_name]
         else:
-            res = {}
-            for k,v in self.trackers.items():
-                res[k] = self.MPR_fun(self, v, seqs)
-            return res
+            return self.MPR_fun.evaluate(self, self.trackers, seqs, workers)
 
 
-    def MSR(self, tracker_name:Any=None, seqs=None):
+    def MSR(self, tracker_name:Any=None, seqs=None, workers=None):
         """
         NOTE
         ---------
@@ -81,6 +83,8 @@ class GTOT(BaseRGBTDataet):
             Default is None, evaluate all registered trackers.
         [in] seqs - list
             Sequence to be evaluated, default is all.
+        [in] workers - int
+            Evaluate with a pool of processes, see `Metric.evaluate`.
         
         Returns
         -------
@@ -91,35 +95,34 @@ class GTOT(BaseRGBTDataet):
             seqs = self.seqs_name
 
         if tracker_name!=None:
-            return self.MSR_fun(self, self.trackers[tracker_name], seqs)
+            if workers==None:
+                return self.MSR_fun(self, self.trackers[tracker_name], seqs)
+            return self.MSR_fun.evaluate(self, {tracker_name: self.trackers[tracker_name]}, seqs, workers)[tracker_name]
         else:
-            res = {}
-            for k,v in self.trackers.items():
-                res[k] = self.MSR_fun(self, v, seqs)
-            return res
+            return self.MSR_fun.evaluate(self, self.trackers, seqs, workers)
 
 
-    def pr_plot(self, filename=None, seqs=None, plotSetting=None):
-        return self.mpr_plot(filename=filename, seqs=seqs, plotSetting=plotSetting)
+    def pr_plot(self, filename=None, seqs=None, plotSetting=None, workers=None):
+        return self.mpr_plot(filename=filename, seqs=seqs, plotSetting=plotSetting, workers=workers)
 
 
-    def sr_plot(self, filename=None, seqs=None, plotSetting=None):
-        return self.msr_plot(filename=filename, seqs=seqs, plotSetting=plotSetting)
+    def sr_plot(self, filename=None, seqs=None, plotSetting=None, workers=None):
+        return self.msr_plot(filename=filename, seqs=seqs, plotSetting=plotSetting, workers=workers)
 
 
-    def mpr_plot(self, filename=None, seqs=None, plotSetting=None):
+    def mpr_plot(self, filename=None, seqs=None, plotSetting=None, workers=None):
         metric_fun=self.MPR
         if plotSetting==None:
             plotSetting = self.MPR_PlotSetting
         if filename!=None:
             plotSetting.filename = filename
-        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting)
+        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting, workers=workers)
     
 
-    def msr_plot(self, filename=None, seqs=None, plotSetting=None):
+    def msr_plot(self, filename=None, seqs=None, plotSetting=None, workers=None):
         metric_fun=self.MSR
         if plotSetting==None:
             plotSetting = self.MSR_PlotSetting
         if filename!=None:
             plotSetting.filename = filename
-        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting)
\ No newline at end of file
+        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting, workers=workers)
\ No newline at end of file
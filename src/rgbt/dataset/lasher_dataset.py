@@ -11,9 +11,14 @@ class LasHeR(BaseRGBTDataet):
     [Download Dataset.](https://github.com/mmic-lcl/Datasets-and-benchmark-code)
     """
     def __init__(self, gt_path=f'{_basepath}/gt_file/LasHeR/lasher_gt/',
-                 seq_name_path=f"{_basepath}/gt_file/LasHeR/lashertest.txt") -> None:
+                 seq_name_path=f"{_basepath}/gt_file/LasHeR/lashertest.txt", convention=None) -> None:
         seqs = load_text(seq_name_path, dtype=str)
-        super().__init__(gt_path=gt_path, seqs=seqs, bbox_type='ltwh')
+        # Challenge attributes
+        self._attr_list = ('NO', 'PO', 'TO', 'HO', 'MB', 
+                           'LI', 'HI', 'AIV', 'LR', 'DEF', 
+                           'BC', 'SA', 'CM', 'TC', 'FL', 
+                           'OV', 'FM', 'SV', 'ARC')
+        super().__init__(gt_path=gt_path, seqs=seqs, bbox_type='ltwh', convention=convention)
 
         self.name = 'LasHeR_test'
         self.PR_fun = PR_LasHeR()
@@ -40,11 +45,6 @@ class LasHeR(BaseRGBTDataet):
         self.NPR_PlotSetting.title="Normalized Precision plots of OPE on LasHeR"
 
 
-        # Challenge attributes
-        self._attr_list = ('NO', 'PO', 'TO', 'HO', 'MB', 
-                           'LI', 'HI', 'AIV', 'LR', 'DEF', 
-                           'BC', 'SA', 'CM', 'TC', 'FL', 
-                           'OV', 'FM', 'SV', 'ARC')
         self.NO = self.choose_serial_by_att('NO')
         self.PO = self.choose_serial_by_att('PO')
         self.TO = self.choose_serial_by_att('TO')
@@ -68,20 +68,16 @@ class LasHeR(BaseRGBTDataet):
     def get_attr_list(self):
         return self._attr_list
 
-    def choose_serial_by_att(self, attr):
-        if attr==self.ALL:
-            return self.seqs_name
-        else:
-            seqs = []
-            for seq in self.seqs_name:
-                i = self.get_attr_list().index(attr)
-                path = os.path.join(self.gt_path, '..', 'AttriSeqsTxt', seq+'.txt')
-                p = load_text(path)[i]
-                if p==1.:
-                    seqs.append(seq)
-            return seqs
-
-    def PR(self, tracker_name:Any=None, seqs=None):
+    def _attr_files(self):
+        return [os.path.join(self.gt_path, '..', 'AttriSeqsTxt', seq+'.txt') for seq in self.seqs_name]
+
+    def _read_attr_table(self):
+        return np.stack([load_text(path) for path in self._attr_files()], axis=0)
+
+    def _attr_membership(self, table):
+        return np.asarray(table)==1.
+
+    def PR(self, tracker_name:Any=None, seqs=None, workers=None):
         """
         Parameters
         ----------
@@ -89,6 +85,8 @@ class LasHeR(BaseRGBTDataet):
             Default is None, evaluate all registered trackers.
         [in] seqs - list
             Sequence to be evaluated, default is all.
+        [in] workers - int
+            Evaluate with a pool of processes, see `Metric.evaluate`.
         
         Returns
         -------
@@ -99,29 +97,27 @@ class LasHeR(BaseRGBTDataet):
             seqs = self.seqs_name
 
         if tracker_name!=None:
-            return self.PR_fun(self, self.trackers[tracker_name], seqs)
+            if workers==None:
+                return self.PR_fun(self, self.trackers[tracker_name], seqs)
+            return self.PR_fun.evaluate(self, {tracker_name: self.trackers[tracker_name]}, seqs, workers)[tracker_name]
         else:
-            res = {}
-            for k,v in self.trackers.items():
-                res[k] = self.PR_fun(self, v, seqs)
-            return res
+            return self.PR_fun.evaluate(self, self.trackers, seqs, workers)
 
-    def NPR(self, tracker_name:Any=None, seqs=None):
+    def NPR(self, tracker_name:Any=None, seqs=None, workers=None):
         """
         """
         if seqs==None:
             seqs = self.seqs_name
 
         if tracker_name!=None:
-            return self.NPR_fun(self, self.trackers[tracker_name], seqs)
+            if workers==None:
+                return self.NPR_fun(self, self.trackers[tracker_name], seqs)
+            return self.NPR_fun.evaluate(self, {tracker_name: self.trackers[tracker_name]}, seqs, workers)[tracker_name]
         else:
-            res = {}
-            for k,v in self.trackers.items():
-                res[k] = self.NPR_fun(self, v, seqs)
-            return res
+            return self.NPR_fun.evaluate(self, self.trackers, seqs, workers)
 
 
-    def SR(self, tracker_name:Any=None, seqs=None):
+    def SR(self, tracker_name:Any=None, seqs=None, workers=None):
         """
         Parameters
         ----------
@@ -129,20 +125,21 @@ class LasHeR(BaseRGBTDataet):
             Default is None, evaluate all registered trackers.
         [in] seqs - list
             Sequence to be evaluated, default is all.
+        [in] workers - int
+            Evaluate with a pool of processes, see `Metric.evaluate`.
         """
         if seqs==None:
             seqs = self.seqs_name
 
         if tracker_name!=None:
-            return self.SR_fun(self, self.trackers[tracker_name], seqs)
+            if workers==None:
+                return self.SR_fun(self, self.trackers[tracker_name], seqs)
+            return self.SR_fun.evaluate(self, {tracker_name: self.trackers[tracker_name]}, seqs, workers)[tracker_name]
         else:
-            res = {}
-            for k,v in self.trackers.items():
-                res[k] = self.SR_fun(self, v, seqs)
-            return res
+            return self.SR_fun.evaluate(self, self.trackers, seqs, workers)
 
 
-    def draw_attributeRadar(self, metric_fun, filename=None):
+    def draw_attributeRadar(self, metric_fun, filename=None, workers=None):
         if filename==None:
             filename = self.name
             if metric_fun==self.PR:
@@ -150,29 +147,29 @@ class LasHeR(BaseRGBTDataet):
             elif metric_fun==self.SR:
                 filename+="_SR"
             filename+="_radar.png"
-        return super().draw_attributeRadar(metric_fun, filename)
+        return super().draw_attributeRadar(metric_fun, filename, workers=workers)
     
 
-    def pr_plot(self, filename=None, seqs=None, plotSetting=None):
+    def pr_plot(self, filename=None, seqs=None, plotSetting=None, workers=None):
         metric_fun=self.PR
         if filename!=None:
             self.PR_PlotSetting.filename = filename
         if plotSetting==None:
             plotSetting = self.PR_PlotSetting
-        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting)
+        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting, workers=workers)
     
-    def npr_plot(self, filename=None, seqs=None, plotSetting=None):
+    def npr_plot(self, filename=None, seqs=None, plotSetting=None, workers=None):
         metric_fun=self.NPR
         if plotSetting==None:
             plotSetting = self.NPR_PlotSetting
         if filename!=None:
             plotSetting.filename = filename
-        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting)
+        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting, workers=workers)
 
-    def sr_plot(self, filename=None, seqs=None, plotSetting=None):
+    def sr_plot(self, filename=None, seqs=None, plotSetting=None, workers=None):
         metric_fun=self.SR
         if plotSetting==None:
             plotSetting = self.SR_PlotSetting
         if filename!=None:
             plotSetting.filename = filename
-        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting)
\ No newline at end of file
+        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting, workers=workers)
\ No newline at end of file
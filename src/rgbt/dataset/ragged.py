@@ -0,0 +1,196 @@
+"""
+Ragged columnar box storage.
+
+The boxes of all sequences are kept in one contiguous (total_frames, 4) array
+with an offset table, instead of a Python list of boxes per sequence. Indexing
+by sequence name returns a view of its rows, so nothing is copied and whole
+datasets can be processed with array operations.
+
+`RaggedBoxes.compact` stores boxes with integer coordinates as a smaller integer type
+and converts the rows of a sequence back to the original type when it is read, so the
+metrics see the same values with less memory. The result boxes are float32, so only
+int16 is smaller: they are compacted when every coordinate is an integer in
+[-32768, 32767], and kept as float32 otherwise. int32 only applies to float64 boxes.
+"""
+import numpy as np
+
+
+def _exact(values, dtype):
+    # every value survives the round trip through `dtype`, NaN does not and -0.0 comes back as 0.0
+    with np.errstate(invalid='ignore', over='ignore'):
+        cast = values.astype(dtype)
+    return np.array_equal(cast.astype(values.dtype), values)
+
+
+def compact_dtype(boxes):
+    """
+    The smallest integer type holding every value of `boxes` exactly and narrower than their
+    type, None when there is none: int16 for float32 boxes, int16 or int32 for float64 boxes.
+    """
+    boxes = np.asarray(boxes)
+    for dtype in (np.int16, np.int32):
+        if np.dtype(dtype).itemsize<boxes.dtype.itemsize and _exact(boxes, dtype):
+            return np.dtype(dtype)
+    return None
+
+
+class RaggedBoxes:
+    """
+    [in] seqs - list
+        Sequence names, in the order of their rows in `boxes`.
+    [in] boxes - ndarray
+        Shape (total_frames, k).
+    [in] offsets - ndarray
+        Shape (len(seqs)+1,), the rows of seqs[i] are boxes[offsets[i]:offsets[i+1]].
+    [in] dtype - dtype
+        Type of the rows returned by indexing, default the type of `boxes`. When it differs
+        (see `compact`) every access returns a converted copy instead of a view.
+    """
+    def __init__(self, seqs:list, boxes, offsets, dtype=None) -> None:
+        self.seqs = list(seqs)
+        self.boxes = boxes
+        self.dtype = boxes.dtype if dtype==None else np.dtype(dtype)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self._index = {seq_name:i for i,seq_name in enumerate(self.seqs)}
+        if len(self.offsets)!=len(self.seqs)+1:
+            raise ValueError(f"Expect {len(self.seqs)+1} offsets, got {len(self.offsets)}.")
+
+
+    @staticmethod
+    def from_arrays(seqs:list, arrays:list):
+        """
+        Concatenate one array of boxes per sequence.
+        """
+        arrays = [np.atleast_2d(a) for a in arrays]
+        widths = {a.shape[1] for a in arrays}
+        if len(widths)>1:
+            raise ValueError(f"Sequences have a different number of columns: {sorted(widths)}")
+        offsets = np.zeros(len(arrays)+1, dtype=np.int64)
+        np.cumsum([len(a) for a in arrays], out=offsets[1:])
+        boxes = np.concatenate(arrays, axis=0) if arrays else np.zeros((0, 4), dtype=np.float32)
+        return RaggedBoxes(seqs, boxes, offsets)
+
+
+    @staticmethod
+    def from_spans(seqs:list, boxes, spans:list):
+        """
+        Sequences given as (start, stop) rows of `boxes`. A view of `boxes` is kept
+        when the spans follow each other, else the rows are gathered into a new array.
+        """
+        spans = np.asarray(spans, dtype=np.int64).reshape(-1, 2)
+        if len(spans)==0:
+            return RaggedBoxes.from_arrays(seqs, [])
+        if np.array_equal(spans[1:, 0], spans[:-1, 1]):
+            offsets = np.append(spans[:, 0], spans[-1, 1]) - spans[0, 0]
+            return RaggedBoxes(seqs, boxes[spans[0, 0]:spans[-1, 1]], offsets)
+        return RaggedBoxes.from_arrays(seqs, [boxes[start:stop] for start, stop in spans])
+
+
+    def map(self, fun):
+        """
+        Apply `fun` to the whole (total_frames, k) array, e.g. a bbox conversion.
+        """
+        return RaggedBoxes(self.seqs, fun(self.boxes.astype(self.dtype, copy=False)), self.offsets)
+
+
+    def compact(self):
+        """
+        A copy storing the boxes as `compact_dtype`, int16 for float32 boxes whose coordinates
+        are all integers in range, else the boxes are kept as they are (see `is_compact`). Reading a sequence gives the same values
+        in the original type.
+        """
+        dtype = compact_dtype(self.boxes)
+        if dtype==None:
+            return self
+        return RaggedBoxes(self.seqs, self.boxes.astype(dtype), self.offsets, dtype=self.dtype)
+
+
+    @property
+    def is_compact(self):
+        return self.boxes.dtype!=self.dtype
+
+
+    def set_box(self, seq_name, i:int, box):
+        """
+        Overwrite box `i` of a sequence. A compact array goes back to the original
+        type when the box is not an integer box in range.
+        """
+        box = np.asarray(box, dtype=self.dtype)
+        if self.is_compact and not _exact(box, self.boxes.dtype):
+            self.boxes = self.boxes.astype(self.dtype)
+        self.boxes[self.offsets[self._index[seq_name]]:self.offsets[self._index[seq_name]+1]][i] = box
+
+
+    def lengths(self):
+        return np.diff(self.offsets)
+
+
+    @property
+    def nbytes(self):
+        return self.boxes.nbytes + self.offsets.nbytes
+
+
+    def __getitem__(self, seq_name):
+        i = self._index[seq_name]
+        rows = self.boxes[self.offsets[i]:self.offsets[i+1]]
+        return rows if rows.dtype==self.dtype else rows.astype(self.dtype)
+
+    def __contains__(self, seq_name):
+        return seq_name in self._index
+
+    def __len__(self):
+        return len(self.seqs)
+
+    def __iter__(self):
+        return iter(self.seqs)
+
+    def keys(self):
+        return list(self.seqs)
+
+    def values(self):
+        return [self[seq_name] for seq_name in self.seqs]
+
+    def items(self):
+        return [(seq_name, self[seq_name]) for seq_name in self.seqs]
+
+    def __repr__(self) -> str:
+        return f"RaggedBoxes({len(self.seqs)} sequences, boxes={self.boxes.shape} {self.boxes.dtype})"
+
+
+class ModalityBoxes:
+    """
+    One `RaggedBoxes` per modality, `boxes[seq_name]` returns {modality: view}.
+    """
+    def __init__(self, modalities:dict) -> None:
+        self.modalities = modalities
+        self.seqs = next(iter(modalities.values())).seqs if modalities else []
+
+
+    @property
+    def nbytes(self):
+        return sum(ragged.nbytes for ragged in self.modalities.values())
+
+
+    def __getitem__(self, seq_name):
+        return {m: ragged[seq_name] for m, ragged in self.modalities.items()}
+
+    def __contains__(self, seq_name):
+        return seq_name in next(iter(self.modalities.values()))
+
+    def __len__(self):
+        return len(self.seqs)
+
+    def __iter__(self):
+        return iter(self.seqs)
+
+    def keys(self):
+        return list(self.seqs)
+
+    def values(self):
+        return [self[seq_name] for seq_name in self.seqs]
+
+    def items(self):
+        return [(seq_name, self[seq_name]) for seq_name in self.seqs]
+
+    def __repr__(self) -> str:
+        return f"ModalityBoxes({', '.join(self.modalities)}; {len(self.seqs)} sequences)"
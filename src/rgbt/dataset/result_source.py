@@ -0,0 +1,331 @@
+"""
+Where the result files of a tracker come from.
+
+A result can be a directory of `.txt`, `.txt.gz` or `.npy` files, a `.zip` or
+`.tar(.gz|.bz2|.xz)` archive of such files, or a single `.npz` holding one array
+per sequence. Members of an archive are matched by their base name (`prefix+seq_name`),
+so the folder layout inside the archive does not matter, and they are read in
+one sequential sweep without extracting anything to disk. A lazy result reads one
+sequence at a time (`read_one`): the archive is then indexed once and kept open, and
+a compressed tar, which cannot be read at an offset, is read in full on the first call.
+"""
+import io
+import os
+import gzip
+import tarfile
+import zipfile
+import numpy as np
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from rgbt.utils import load_text, parse_boxes
+
+
+RESULT_EXTS = ('.txt', '.txt.gz', '.npy')
+ARCHIVE_EXTS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+
+
+class ResultLoadError(Exception):
+    """
+    Some result files could not be read. `errors` maps each file to its exception.
+    """
+    def __init__(self, errors:dict) -> None:
+        self.errors = errors
+        lines = [f'{path}: {err!r}' for path, err in errors.items()]
+        super().__init__(f'{len(errors)} result file(s) could not be read:\n' + '\n'.join(lines))
+
+    def __reduce__(self):
+        return ResultLoadError, (self.errors,)
+
+
+def _split_ext(name:str):
+    for ext in RESULT_EXTS:
+        if name.endswith(ext):
+            return name[:-len(ext)], ext
+    return name, None
+
+
+def parse_result_bytes(data:bytes, name:str):
+    """
+    Parse the content of one result file, the format follows the file name.
+    """
+    if name.endswith('.npy'):
+        return np.load(io.BytesIO(data))
+    if name.endswith('.gz'):
+        data = gzip.decompress(data)
+    return parse_boxes(data.decode().splitlines(), name)
+
+
+def read_result_file(path:str):
+    """
+    Read one result file (`.txt`, `.txt.gz` or `.npy`), rounded to integer pixels.
+    """
+    if path.endswith('.npy'):
+        serial = np.load(path)
+    elif path.endswith('.gz'):
+        with gzip.open(path, 'rt') as f:
+            serial = parse_boxes(f.read().splitlines(), path)
+    else:
+        serial = load_text(path)
+    return serial.round(0)
+
+
+def _read_result(path:str):
+    try:
+        return True, read_result_file(path)
+    except Exception as e:
+        return False, e
+
+
+def read_result_files(paths:list, workers=None, executor='thread'):
+    """
+    Read result files concurrently, the returned arrays follow the order of `paths`.
+    Files are only parsed here, the bbox conversion is left to the caller.
+    """
+    if isinstance(executor, Executor):
+        outputs = list(executor.map(_read_result, paths))
+    elif executor=='process':
+        workers = workers or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(_read_result, paths, chunksize=max(1, len(paths)//(workers*4))))
+    elif executor=='thread':
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(_read_result, paths))
+    else:
+        raise ValueError(f"Unknown executor: {executor}")
+
+    errors = {path:out for path,(ok,out) in zip(paths, outputs) if not ok}
+    if errors:
+        raise ResultLoadError(errors)
+    return [out for ok,out in outputs]
+
+
+class ResultSource:
+    """
+    Base class. `read` returns {seq_name: array} rounded to integer pixels and raises
+    `ResultLoadError` listing every sequence that could not be read.
+    """
+    def __init__(self, path:str, prefix='') -> None:
+        self.path = path
+        self.prefix = prefix
+
+    def read(self, seqs:list, workers=None, executor='thread') -> dict:
+        raise NotImplementedError
+
+    def read_one(self, seq_name):
+        return self.read([seq_name])[seq_name]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.path!r}, prefix={self.prefix!r})"
+
+
+class DirectorySource(ResultSource):
+    """
+    One file per sequence in a directory, `<prefix><seq_name>.txt` (or `.txt.gz`, `.npy`).
+    When several exist, the first extension of `RESULT_EXTS` is read.
+    """
+    def __init__(self, path:str, prefix='') -> None:
+        super().__init__(path, prefix)
+        self._exts = None
+
+    def file_path(self, seq_name):
+        if self._exts==None:
+            # one listing instead of probing every extension of every sequence
+            try:
+                names = os.listdir(self.path)
+            except OSError:
+                names = []
+            self._exts = {}
+            for name in names:
+                stem, ext = _split_ext(name)
+                if ext!=None and (stem not in self._exts or RESULT_EXTS.index(ext)<RESULT_EXTS.index(self._exts[stem])):
+                    self._exts[stem] = ext
+        return os.path.join(self.path, self.prefix+seq_name+self._exts.get(self.prefix+seq_name, '.txt'))
+
+    def read(self, seqs:list, workers=None, executor='thread') -> dict:
+        paths = [self.file_path(seq_name) for seq_name in seqs]
+        if workers==None and not isinstance(executor, Executor):
+            # the errors of all files are collected as in `read_result_files`
+            outputs = [_read_result(p) for p in paths]
+            errors = {p:out for p,(ok,out) in zip(paths, outputs) if not ok}
+            if errors:
+                raise ResultLoadError(errors)
+            return {seq_name:out for seq_name,(ok,out) in zip(seqs, outputs)}
+        return dict(zip(seqs, read_result_files(paths, workers, executor)))
+
+    def read_one(self, seq_name):
+        return read_result_file(self.file_path(seq_name))
+
+
+class _ArchiveSource(ResultSource):
+    def __init__(self, path:str, prefix='') -> None:
+        super().__init__(path, prefix)
+        self._handle = None
+        self._index = None      # {member stem: member} of `_members`
+
+    def _members(self):
+        raise NotImplementedError
+
+    def _read_member(self, member):
+        raise NotImplementedError
+
+    def read_one(self, seq_name):
+        # one index of the archive for all sequences, instead of a sweep per sequence
+        if self._index==None:
+            self._members()
+        key = self.prefix+seq_name
+        try:
+            if key not in self._index:
+                raise FileNotFoundError(f"{key} not found in {self.path}")
+            return self._read_member(self._index[key]).round(0)
+        except Exception as e:
+            raise ResultLoadError({f'{self.path}:{key}':e})
+
+    def close(self):
+        if self._handle!=None:
+            self._handle.close()
+        self._handle = None
+        self._index = None
+
+    def __getstate__(self):
+        # an open archive is not sent to other processes, it is opened again there
+        state = self.__dict__.copy()
+        state['_handle'] = None
+        state['_index'] = None
+        return state
+
+    def _wanted(self, seqs:list):
+        return {self.prefix+seq_name:seq_name for seq_name in seqs}
+
+    def _collect(self, seqs:list, found:dict, errors:dict):
+        for seq_name in seqs:
+            if seq_name not in found and seq_name not in errors:
+                errors[seq_name] = FileNotFoundError(f"{self.prefix+seq_name} not found in {self.path}")
+        if errors:
+            raise ResultLoadError({f'{self.path}:{self.prefix+seq_name}':err for seq_name,err in errors.items()})
+        return {seq_name:found[seq_name] for seq_name in seqs}
+
+
+class ZipSource(_ArchiveSource):
+    """
+    Result files inside a `.zip` archive.
+    """
+    def read(self, seqs:list, workers=None, executor='thread') -> dict:
+        wanted = self._wanted(seqs)
+        found, errors = {}, {}
+        with zipfile.ZipFile(self.path) as zf:
+            members = {}
+            for info in zf.infolist():
+                stem, ext = _split_ext(os.path.basename(info.filename))
+                if ext!=None and stem in wanted and wanted[stem] not in members:
+                    members[wanted[stem]] = info
+            # in the order of the archive, so the file is read front to back
+            for seq_name, info in sorted(members.items(), key=lambda item: item[1].header_offset):
+                try:
+                    found[seq_name] = parse_result_bytes(zf.read(info), info.filename).round(0)
+                except Exception as e:
+                    errors[seq_name] = e
+        return self._collect(seqs, found, errors)
+
+    def _members(self):
+        self._handle = zipfile.ZipFile(self.path)
+        self._index = {}
+        for info in self._handle.infolist():
+            stem, ext = _split_ext(os.path.basename(info.filename))
+            if ext!=None:
+                self._index.setdefault(stem, info)
+
+    def _read_member(self, info):
+        return parse_result_bytes(self._handle.read(info), info.filename)
+
+
+class TarSource(_ArchiveSource):
+    """
+    Result files inside a `.tar` archive, optionally compressed. The archive is
+    streamed once from front to back.
+    """
+    def read(self, seqs:list, workers=None, executor='thread') -> dict:
+        wanted = self._wanted(seqs)
+        found, errors = {}, {}
+        with tarfile.open(self.path, 'r|*') as tf:
+            for member in tf:
+                if not member.isfile():
+                    continue
+                stem, ext = _split_ext(os.path.basename(member.name))
+                if ext==None or stem not in wanted or wanted[stem] in found:
+                    continue
+                seq_name = wanted[stem]
+                try:
+                    found[seq_name] = parse_result_bytes(tf.extractfile(member).read(), member.name).round(0)
+                except Exception as e:
+                    errors[seq_name] = e
+                if len(found)+len(errors)==len(wanted):
+                    break
+        return self._collect(seqs, found, errors)
+
+    def _members(self):
+        # (name, offset, size) in a plain tar, read at the offset; (name, None, content) in a compressed one
+        self._index = {}
+        if self.path.lower().endswith('.tar'):
+            with tarfile.open(self.path, 'r:') as tf:
+                for member in tf:
+                    stem, ext = _split_ext(os.path.basename(member.name))
+                    if member.isfile() and ext!=None:
+                        self._index.setdefault(stem, (member.name, member.offset_data, member.size))
+            self._handle = open(self.path, 'rb')
+            return
+        with tarfile.open(self.path, 'r|*') as tf:
+            for member in tf:
+                stem, ext = _split_ext(os.path.basename(member.name))
+                if member.isfile() and ext!=None and stem not in self._index:
+                    self._index[stem] = (member.name, None, tf.extractfile(member).read())
+
+    def _read_member(self, member):
+        name, offset, data = member
+        if offset!=None:
+            self._handle.seek(offset)
+            data = self._handle.read(data)
+        return parse_result_bytes(data, name)
+
+
+class NpzSource(_ArchiveSource):
+    """
+    A `.npz` file with one array per sequence, keyed by `<prefix><seq_name>`.
+    """
+    def read(self, seqs:list, workers=None, executor='thread') -> dict:
+        wanted = self._wanted(seqs)
+        found, errors = {}, {}
+        with np.load(self.path) as npz:
+            for key in npz.files:
+                stem = _split_ext(os.path.basename(key))[0]
+                if stem in wanted and wanted[stem] not in found:
+                    try:
+                        found[wanted[stem]] = np.asarray(npz[key]).round(0)
+                    except Exception as e:
+                        errors[wanted[stem]] = e
+        return self._collect(seqs, found, errors)
+
+    def _members(self):
+        self._handle = np.load(self.path)
+        self._index = {}
+        for key in self._handle.files:
+            self._index.setdefault(_split_ext(os.path.basename(key))[0], key)
+
+    def _read_member(self, key):
+        return np.asarray(self._handle[key])
+
+
+def open_result_source(path, prefix='') -> ResultSource:
+    """
+    Choose the source type from the path: a `ResultSource` is returned as it is,
+    archives and `.npz` by their extension, anything else is a directory.
+    """
+    if isinstance(path, ResultSource):
+        return path
+    path = os.fspath(path)
+    lower = path.lower()
+    if lower.endswith('.zip'):
+        return ZipSource(path, prefix)
+    if lower.endswith(ARCHIVE_EXTS[1:]):
+        return TarSource(path, prefix)
+    if lower.endswith('.npz'):
+        return NpzSource(path, prefix)
+    return DirectorySource(path, prefix)
@@ -2,6 +2,7 @@
 from .basedataset import BaseRGBTDataet,_basepath
 from rgbt.utils import *
 import os
+import warnings
 from rgbt.metrics import PR,SR
 from rgbt.vis.default_config import Setting, get_PR_Setting, get_SR_Setting
 
@@ -12,10 +13,14 @@ class RGBT210(BaseRGBTDataet):
     [Paper](https://dl.acm.org/doi/pdf/10.1145/3123266.3123289) \r
     [Download Dataset.](https://github.com/mmic-lcl/Datasets-and-benchmark-code)
     """
+    convention = LOOSE_LOAD     # results converted loosely, metrics computed strictly
+
     def __init__(self, gt_path=f'{_basepath}/gt_file/RGBT210/groundtruth/',
-                 seq_name_path=f"{_basepath}/gt_file/RGBT210/SequencesName.txt") -> None:
+                 seq_name_path=f"{_basepath}/gt_file/RGBT210/SequencesName.txt", convention=None) -> None:
         seqs = load_text(seq_name_path, dtype=str)
-        super().__init__(gt_path=gt_path, seqs=seqs, bbox_type='ltwh', v_name='init.txt', i_name='init.txt')
+        # Challenge attributes
+        self._attr_list = ("BC","CM","DEF","FM","HO","LI","LR","MB","NO","TC","PO","SC")
+        super().__init__(gt_path=gt_path, seqs=seqs, bbox_type='ltwh', v_name='init.txt', i_name='init.txt', convention=convention)
 
         self.name = 'RGBT210'
         self.PR_fun = PR()
@@ -29,8 +34,6 @@ class RGBT210(BaseRGBTDataet):
         self.SR_PlotSetting.axis = self.SR_fun.thr
         self.SR_PlotSetting.filename = self.name+"_SR_plot.png"
 
-        # Challenge attributes
-        self._attr_list = ("BC","CM","DEF","FM","HO","LI","LR","MB","NO","TC","PO","SC")
         self.BC = self.choose_serial_by_att("BC")
         self.CM = self.choose_serial_by_att("CM")
         self.DEF = self.choose_serial_by_att("DEF")
@@ -44,28 +47,36 @@ class RGBT210(BaseRGBTDataet):
         self.PO = self.choose_serial_by_att("PO")
         self.SC = self.choose_serial_by_att("SC")
 
-    def __call__(self, tracker_name, result_path: str, seqs=None, prefix='', bbox_type='ltwh'):
-        RGBT_start()
-        res = super().__call__(tracker_name, result_path, seqs, prefix, bbox_type)
-        RGBT_end()
-        return res
-
     def get_attr_list(self):
         return self._attr_list
 
-    def choose_serial_by_att(self, attr):
-        if attr==self.ALL:
-            return self.seqs_name
-        else:
-            p = load_text(os.path.join(self.gt_path, '..', 'attr_txt', attr+'.txt'))
-            with open(os.path.join(self.gt_path, '..', 'attr_txt', 'SequencesName.txt')) as f:
-                seq_name_s = f.read().split('\n')
-            seq_name_s = seq_name_s[:len(p)]
-            return [seq_name for i,seq_name in zip(p, seq_name_s) if (i and seq_name in self.seqs_name)]
-
-
-
-    def PR(self, tracker_name:Any=None, seqs=None):
+    def _attr_files(self):
+        return [os.path.join(self.gt_path, '..', 'attr_txt', attr+'.txt') for attr in self.get_attr_list()] + \
+               [os.path.join(self.gt_path, '..', 'attr_txt', 'SequencesName.txt')]
+
+
+    def _read_attr_table(self):
+        # The attribute files follow the sequence order of RGBT234.
+        with open(os.path.join(self.gt_path, '..', 'attr_txt', 'SequencesName.txt')) as f:
+            seq_name_s = f.read().split('\n')
+        p = np.stack([load_text(path) for path in self._attr_files()[:-1]], axis=1)
+        index = {}
+        for i,seq_name in enumerate(seq_name_s[:len(p)]):
+            index.setdefault(seq_name, i)
+        # a sequence without an attribute row has no attribute, as when filtering by name
+        missing = [seq_name for seq_name in self.seqs_name if seq_name not in index]
+        if missing:
+            warnings.warn(f"{len(missing)} sequence(s) without attributes in attr_txt: {', '.join(missing[:5])}"
+                          + (', ...' if len(missing)>5 else ''))
+        table = np.zeros((len(self.seqs_name), p.shape[1]), dtype=p.dtype)
+        for j,seq_name in enumerate(self.seqs_name):
+            if seq_name in index:
+                table[j] = p[index[seq_name]]
+        return table
+
+
+
+    def PR(self, tracker_name:Any=None, seqs=None, workers=None):
         """
         Parameters
         ----------
@@ -73,6 +84,8 @@ class RGBT210(BaseRGBTDataet):
             Default is None, evaluate all registered trackers.
         [in] seqs - list
             Sequence to be evaluated, default is all.
+        [in] workers - int
+            Evaluate with a pool of processes, see `Metric.evaluate`.
         
         Returns
         -------
@@ -83,16 +96,15 @@ class RGBT210(BaseRGBTDataet):
             seqs = self.seqs_name
 
         if tracker_name!=None:
-            return self.PR_fun(self, self.trackers[tracker_name], seqs)
+            if workers==None:
+                return self.PR_fun(self, self.trackers[tracker_name], seqs)
+            return self.PR_fun.evaluate(self, {tracker_name: self.trackers[tracker_name]}, seqs, workers)[tracker_name]
         else:
-            res = {}
-            for k,v in self.trackers.items():
-                res[k] = self.PR_fun(self, v, seqs)
-            return res
+            return self.PR_fun.evaluate(self, self.trackers, seqs, workers)
 
 
 
-    def SR(self, tracker_name:Any=None, seqs=None):
+    def SR(self, tracker_name:Any=None, seqs=None, workers=None):
         """
         Parameters
         ----------
@@ -100,6 +112,8 @@ class RGBT210(BaseRGBTDataet):
             Default is None, evaluate all registered trackers.
         [in] seqs - list
             Sequence to be evaluated, default is all.
+        [in] workers - int
+            Evaluate with a pool of processes, see `Metric.evaluate`.
         
         Returns
         -------
@@ -110,15 +124,14 @@ class RGBT210(BaseRGBTDataet):
             seqs = self.seqs_name
 
         if tracker_name!=None:
-            return self.SR_fun(self, self.trackers[tracker_name], seqs)
+            if workers==None:
+                return self.SR_fun(self, self.trackers[tracker_name], seqs)
+            return self.SR_fun.evaluate(self, {tracker_name: self.trackers[tracker_name]}, seqs, workers)[tracker_name]
         else:
-            res = {}
-            for k,v in self.trackers.items():
-                res[k] = self.SR_fun(self, v, seqs)
-            return res
+            return self.SR_fun.evaluate(self, self.trackers, seqs, workers)
 
 
-    def draw_attributeRadar(self, metric_fun, filename=None):
+    def draw_attributeRadar(self, metric_fun, filename=None, workers=None):
         if filename==None:
             filename = self.name
             if metric_fun==self.PR:
@@ -126,22 +139,22 @@ class RGBT210(BaseRGBTDataet):
             elif metric_fun==self.SR:
                 filename+="_SR"
             filename+="_radar.png"
-        return super().draw_attributeRadar(metric_fun, filename)
+        return super().draw_attributeRadar(metric_fun, filename, workers=workers)
         
 
-    def pr_plot(self, filename=None, seqs=None, plotSetting=None):
+    def pr_plot(self, filename=None, seqs=None, plotSetting=None, workers=None):
         metric_fun=self.PR
         if plotSetting==None:
             plotSetting = self.PR_PlotSetting
         if filename!=None:
             plotSetting.filename = filename
-        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting)
+        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting, workers=workers)
     
 
-    def sr_plot(self, filename=None, seqs=None, plotSetting=None):
+    def sr_plot(self, filename=None, seqs=None, plotSetting=None, workers=None):
         metric_fun=self.SR
         if plotSetting==None:
             plotSetting = self.SR_PlotSetting
         if filename!=None:
             plotSetting.filename = filename
-        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting)
\ No newline at end of file
+        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting, workers=workers)
\ No newline at end of file
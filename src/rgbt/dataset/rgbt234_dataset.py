@@ -12,10 +12,14 @@ class RGBT234(BaseRGBTDataet):
     [Paper.](https://arxiv.org/abs/1805.08982) \r
     [Download Dataset.](https://github.com/mmic-lcl/Datasets-and-benchmark-code)
     """
+    convention = LOOSE_LOAD     # results converted loosely, metrics computed strictly
+
     def __init__(self, gt_path=f'{_basepath}/gt_file/RGBT234/rgbt234_gt/',
-                 seq_name_path=f"{_basepath}/gt_file/RGBT234/attr_txt/SequencesName.txt") -> None:
+                 seq_name_path=f"{_basepath}/gt_file/RGBT234/attr_txt/SequencesName.txt", convention=None) -> None:
         seqs = load_text(seq_name_path, dtype=str)
-        super().__init__(gt_path=gt_path, seqs=seqs, bbox_type='ltwh', v_name='visible.txt', i_name='infrared.txt')
+        # Challenge attributes
+        self._attr_list = ("BC","CM","DEF","FM","HO","LI","LR","MB","NO","TC","PO","SC")
+        super().__init__(gt_path=gt_path, seqs=seqs, bbox_type='ltwh', v_name='visible.txt', i_name='infrared.txt', convention=convention)
 
         self.name = 'RGBT234'
 
@@ -30,8 +34,6 @@ class RGBT234(BaseRGBTDataet):
         self.MSR_PlotSetting.axis = self.MSR_fun.thr
         self.MSR_PlotSetting.filename = self.name+"_MSR_plot.png"
 
-        # Challenge attributes
-        self._attr_list = ("BC","CM","DEF","FM","HO","LI","LR","MB","NO","TC","PO","SC")
         self.BC = self.choose_serial_by_att("BC")
         self.CM = self.choose_serial_by_att("CM")
         self.DEF = self.choose_serial_by_att("DEF")
@@ -52,26 +54,19 @@ class RGBT234(BaseRGBTDataet):
                 [Download Dataset.](https://github.com/mmic-lcl/Datasets-and-benchmark-code)"""
 
 
-    def __call__(self, tracker_name, result_path: str, seqs=None, prefix='', bbox_type='ltwh') -> TrackerResult:
-        RGBT_start()
-        res = super().__call__(tracker_name, result_path, seqs, prefix, bbox_type)
-        RGBT_end()
-        return res
-
-
     def get_attr_list(self):
         return self._attr_list
 
 
-    def choose_serial_by_att(self, attr):
-        if attr==self.ALL:
-            return self.seqs_name
-        else:
-            p = load_text(os.path.join(self.gt_path, '..', 'attr_txt', attr+'.txt'))
-            return [seq_name for i,seq_name in zip(p, self.seqs_name) if i]
+    def _attr_files(self):
+        return [os.path.join(self.gt_path, '..', 'attr_txt', attr+'.txt') for attr in self.get_attr_list()]
+
+
+    def _read_attr_table(self):
+        return np.stack([load_text(path) for path in self._attr_files()], axis=1)
 
 
-    def MPR(self, tracker_name:Any=None, seqs=None):
+    def MPR(self, tracker_name:Any=None, seqs=None, workers=None):
         """
         NOTE
         ---------
@@ -91,6 +86,8 @@ class RGBT234(BaseRGBTDataet):
             Default is None, evaluate all registered trackers.
         [in] seqs - list
             Sequence to be evaluated, default is all.
+        [in] workers - int
+            Evaluate with a pool of processes, see `Metric.evaluate`.
         
         Returns
         -------
@@ -101,15 +98,14 @@ class RGBT234(BaseRGBTDataet):
             seqs = self.seqs_name
 
         if tracker_name!=None:
-            return self.MPR_fun(self, self.trackers[tracker_name], seqs)
+            if workers==None:
+                return self.MPR_fun(self, self.trackers[tracker_name], seqs)
+            return self.MPR_fun.evaluate(self, {tracker_name: self.trackers[tracker_name]}, seqs, workers)[tracker_name]
         else:
-            res = {}
-            for k,v in self.trackers.items():
-                res[k] = self.MPR_fun(self, v, seqs)
-            return res
+            return self.MPR_fun.evaluate(self, self.trackers, seqs, workers)
 
 
-    def MSR(self, tracker_name:Any=None, seqs=None):
+    def MSR(self, tracker_name:Any=None, seqs=None, workers=None):
         """
         NOTE
         ---------
@@ -124,6 +120,8 @@ class RGBT234(BaseRGBTDataet):
             Default is None, evaluate all registered trackers.
         [in] seqs - list
             Sequence to be evaluated, default is all.
+        [in] workers - int
+            Evaluate with a pool of processes, see `Metric.evaluate`.
         
         Returns
         -------
@@ -134,15 +132,14 @@ class RGBT234(BaseRGBTDataet):
             seqs = self.seqs_name
 
         if tracker_name!=None:
-            return self.MSR_fun(self, self.trackers[tracker_name], seqs)
+            if workers==None:
+                return self.MSR_fun(self, self.trackers[tracker_name], seqs)
+            return self.MSR_fun.evaluate(self, {tracker_name: self.trackers[tracker_name]}, seqs, workers)[tracker_name]
         else:
-            res = {}
-            for k,v in self.trackers.items():
-                res[k] = self.MSR_fun(self, v, seqs)
-            return res
+            return self.MSR_fun.evaluate(self, self.trackers, seqs, workers)
 
 
-    def draw_attributeRadar(self, metric_fun, filename:str=''):
+    def draw_attributeRadar(self, metric_fun, filename:str='', workers=None):
         if filename==None:
             filename = self.name
             if metric_fun==self.MPR:
@@ -150,30 +147,30 @@ class RGBT234(BaseRGBTDataet):
             elif metric_fun==self.MSR:
                 filename+="_MSR"
             filename+="_radar.png"
-        return super().draw_attributeRadar(metric_fun, filename)
+        return super().draw_attributeRadar(metric_fun, filename, workers=workers)
 
 
-    def pr_plot(self, filename=None, seqs=None, plotSetting=None):
-        return self.mpr_plot(filename=filename, seqs=seqs, plotSetting=plotSetting)
+    def pr_plot(self, filename=None, seqs=None, plotSetting=None, workers=None):
+        return self.mpr_plot(filename=filename, seqs=seqs, plotSetting=plotSetting, workers=workers)
 
 
-    def sr_plot(self, filename=None, seqs=None, plotSetting=None):
-        return self.msr_plot(filename=filename, seqs=seqs, plotSetting=plotSetting)
+    def sr_plot(self, filename=None, seqs=None, plotSetting=None, workers=None):
+        return self.msr_plot(filename=filename, seqs=seqs, plotSetting=plotSetting, workers=workers)
 
 
-    def mpr_plot(self, filename=None, seqs=None, plotSetting=None):
+    def mpr_plot(self, filename=None, seqs=None, plotSetting=None, workers=None):
         metric_fun=self.MPR
         if plotSetting==None:
             plotSetting = self.MPR_PlotSetting
         if filename!=None:
             plotSetting.filename = filename
-        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting)
+        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting, workers=workers)
     
 
-    def msr_plot(self, filename=None, seqs=None, plotSetting=None):
+    def msr_plot(self, filename=None, seqs=None, plotSetting=None, workers=None):
         metric_fun=self.MSR
         if plotSetting==None:
             plotSetting = self.MSR_PlotSetting
         if filename!=None:
             plotSetting.filename = filename
-        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting)
\ No newline at end of file
+        return super().plot(metric_fun=metric_fun, seqs=seqs, plotSetting=plotSetting, workers=workers)
\ No newline at end of file
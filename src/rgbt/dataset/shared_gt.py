@@ -0,0 +1,188 @@
+"""
+Ground truth in shared memory.
+
+`SharedGT.publish` copies the converted ground truth boxes of every modality, the mask of
+the invalid ground truth frames (`BaseRGBTDataet.gt_invalid`) and the attribute matrix of
+a dataset into one `multiprocessing.shared_memory` block. The block starts with a JSON
+header describing its arrays, so any process attaches by the block name alone and reads
+the arrays in place. A dataset with shared ground truth (`BaseRGBTDataet.share_gt`) pickles
+without its ground truth: a worker process gets the block name and attaches, nothing is
+parsed or copied, and all processes together hold one copy of the ground truth.
+
+    with rgbt234.share_gt():
+        rgbt234.MPR(workers=8)
+
+The publishing process owns the block and removes it on `unlink` (or at the end of the
+`with`). Blocks are tracked by the multiprocessing resource tracker, which also removes
+them when the owner dies. Before Python 3.13 an attaching process started outside
+`multiprocessing` registers the block with its own tracker too, and may warn about or
+remove the block when it exits.
+"""
+import sys
+import json
+import numpy as np
+from multiprocessing import shared_memory
+from .ragged import RaggedBoxes, ModalityBoxes
+
+
+_ALIGN = 64
+_HEADER = 8     # bytes of the header length
+
+
+def _aligned(nbytes:int):
+    return -(-nbytes//_ALIGN)*_ALIGN
+
+
+def _ragged_arrays(prefix:str, ragged:RaggedBoxes):
+    return {f'{prefix}/boxes': ragged.boxes, f'{prefix}/offsets': ragged.offsets}
+
+
+class _Block(shared_memory.SharedMemory):
+    def __del__(self):
+        try:
+            self.close()
+        except BufferError:
+            pass    # views of the block are still referenced, the mapping goes with the last one
+
+
+class SharedGT:
+    """
+    [in] shm - SharedMemory
+        The block.
+    [in] header - dict
+        {'arrays': {key: [offset, dtype, shape]}, 'seqs': [...], 'modalities': [...] or None, 'dtypes': {...}}.
+    [in] start - int
+        Where the arrays start in the block, the offsets of the header are relative to it.
+    [in] owner - bool
+        This process created the block and removes it.
+    """
+    def __init__(self, shm:shared_memory.SharedMemory, header:dict, start:int, owner=False) -> None:
+        self.shm = shm
+        self.name = shm.name
+        self.header = header
+        self.owner = owner
+        self.seqs = header['seqs']
+        self.closed = False
+        self._arrays = {}
+        for key, (offset, dtype, shape) in header['arrays'].items():
+            # frombuffer holds the buffer, the block cannot be unmapped under the views
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape, dtype=np.int64))
+            array = np.frombuffer(shm.buf, dtype=dtype, count=count, offset=start+offset).reshape(shape)
+            array.flags.writeable = False
+            self._arrays[key] = array
+
+
+    @staticmethod
+    def publish(dataset):
+        """
+        Copy the ground truth, invalid frames and attribute matrix of `dataset` into a new block.
+        """
+        gt = dataset.seqs_gt
+        modalities = list(gt.modalities) if isinstance(gt, ModalityBoxes) else None
+        arrays = {}
+        dtypes = {}
+        for modality in (modalities or ['gt']):
+            ragged = gt.modalities[modality] if modalities else gt
+            arrays.update(_ragged_arrays(modality, ragged))
+            dtypes[modality] = str(ragged.dtype)
+        visible = gt.modalities['visible'] if modalities else gt
+        arrays['invalid'] = (visible.boxes<=0).any(axis=1)
+        arrays['attr_matrix'] = np.asarray(dataset.attr_matrix)
+
+        layout, size = {}, 0
+        for key, array in arrays.items():
+            layout[key] = [size, array.dtype.str, list(array.shape)]
+            size += _aligned(array.nbytes)
+        header = {'arrays': layout, 'seqs': list(dataset.seqs_name), 'modalities': modalities, 'dtypes': dtypes}
+        raw = json.dumps(header).encode()
+        start = _aligned(_HEADER+len(raw))
+
+        shm = _Block(create=True, size=start+size)
+        shm.buf[:_HEADER] = len(raw).to_bytes(_HEADER, 'little')
+        shm.buf[_HEADER:_HEADER+len(raw)] = raw
+        for key, array in arrays.items():
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf, offset=start+layout[key][0])[...] = array
+        return SharedGT(shm, header, start, owner=True)
+
+
+    @staticmethod
+    def attach(name:str):
+        """
+        Open a published block by its name, the arrays are read in place.
+        """
+        if sys.version_info>=(3, 13):
+            shm = _Block(name=name, track=False)
+        else:
+            shm = _Block(name=name)
+        size = int.from_bytes(bytes(shm.buf[:_HEADER]), 'little')
+        header = json.loads(bytes(shm.buf[_HEADER:_HEADER+size]).decode())
+        return SharedGT(shm, header, _aligned(_HEADER+size))
+
+
+    def array(self, key:str):
+        return self._arrays[key]
+
+
+    def gt(self):
+        """
+        The ground truth as stored on the dataset, `RaggedBoxes` or `ModalityBoxes` of views.
+        """
+        modalities = self.header['modalities']
+        if modalities==None:
+            return self._ragged('gt')
+        return ModalityBoxes({modality: self._ragged(modality) for modality in modalities})
+
+
+    def _ragged(self, prefix:str):
+        return RaggedBoxes(self.seqs, self._arrays[f'{prefix}/boxes'], self._arrays[f'{prefix}/offsets'],
+                           dtype=self.header['dtypes'][prefix])
+
+
+    def invalid(self):
+        """
+        The mask of `BaseRGBTDataet.gt_invalid` as a ragged column.
+        """
+        modalities = self.header['modalities']
+        offsets = self._arrays[('visible' if modalities else 'gt')+'/offsets']
+        return RaggedBoxes(self.seqs, self._arrays['invalid'], offsets)
+
+
+    @property
+    def attr_matrix(self):
+        return self._arrays['attr_matrix']
+
+
+    @property
+    def nbytes(self):
+        return self.shm.size
+
+
+    def unlink(self):
+        """
+        Remove the block (owner only). Attached processes keep their mapping until they exit.
+        """
+        if self.owner and not self.closed:
+            self.closed = True
+            self._arrays = {}
+            try:
+                self.shm.close()
+            except BufferError:
+                pass    # views of the block are still referenced, the mapping goes with the last one
+            self.shm.unlink()
+
+
+    def __reduce__(self):
+        return (SharedGT.attach, (self.name,))
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.unlink()
+
+
+    def __repr__(self) -> str:
+        return f"SharedGT({self.name}, {len(self.seqs)} seqs, {self.nbytes} bytes{', owner' if self.owner else ''})"
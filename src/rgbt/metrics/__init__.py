@@ -1 +1,10 @@
-from .metrics import MPR,MSR,SR,PR,NPR,PR_LasHeR,SR_LasHeR,MPR_GTOT,MSR_GTOT
\ No newline at end of file
+from .metrics import MPR,MSR,SR,PR,NPR,PR_LasHeR,SR_LasHeR,MPR_GTOT,MSR_GTOT
+from .base import MetricResult
+from .backend import set_backend, get_backend, available_backends
+from .cache import MetricCache
+from .compact import compact_report
+from .stats import bootstrap_ci, metric_bootstrap, paired_permutation_test, sign_flip_test, metric_significance
+from .temporal import Timeline, temporal_analysis
+from .streaming import StreamingEvaluator
+from .partial import MetricState, merge_states, save_states, load_states
+from .sweep import Sweep, sweep_checkpoints
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+Compute backends of the metrics.
+
+'numpy' computes the per-frame scores with the array kernels of `rgbt.utils`, memoizes
+them on the dataset and counts the thresholds with one histogram per sequence of all
+trackers. 'numba' compiles one loop per sequence that scores the boxes of both
+modalities, fuses them (min/max), fills the LasHeR boxes and bins every frame by a binary
+search in the sorted thresholds, without any temporary array. The counts are the same as
+with 'numpy', see `tests/test_backends.py`. It scores one tracker at a time and keeps no
+per-frame scores, so it is opt-in.
+
+The backend is chosen by `Metric(backend=...)`, else `set_backend` or the `RGBT_BACKEND`
+environment variable. 'numpy' is the default, 'auto' uses numba when it is installed, and
+'numba' falls back to 'numpy' when it is not. The scores returned by a metric tell
+which backend computed them (`MetricResult.backend`).
+"""
+import os
+import warnings
+import numpy as np
+from rgbt.utils import threshold_counts, sorted_thresholds, bin_counts
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+BACKEND_ENV = 'RGBT_BACKEND'
+_default = os.environ.get(BACKEND_ENV, 'numpy')
+
+
+class NumpyBackend:
+    name = 'numpy'
+    batched = True      # `Metric.evaluate` may score all trackers of a sequence at once
+
+    def seq_state(self, metric, dataset, result, seq_name):
+        res = metric.frame_values(dataset, result, seq_name)
+        return threshold_counts(res, metric.thr, metric.op), len(res)
+
+
+class NumbaBackend(NumpyBackend):
+    name = 'numba'
+    batched = False
+
+    def seq_state(self, metric, dataset, result, seq_name):
+        serial, gt_v, gt_i, invalid = metric.fused_inputs(dataset, result, seq_name)
+        dtype = np.result_type(serial, gt_v, gt_i)
+        # python constants take the type of the array they meet in the array kernels: the
+        # centers and the normalizing sizes are computed in the type of their own boxes
+        consts = [np.array([0, 1, 2, 1e-8, -1], dtype=t) for t in (dtype, serial.dtype, gt_v.dtype, gt_i.dtype)]
+        thr_sorted, order = sorted_thresholds(metric.thr, dtype)
+        hist, frames = _fused_hist(serial, gt_v, gt_i, invalid, _KERNELS[metric.kernel.__name__], _FUSIONS[metric.fusion],
+                                   metric.eval_strict(dataset), metric.variant=='lasher', thr_sorted, _OPS[metric.op], *consts)
+        return bin_counts(hist, order, metric.op), int(frames)
+
+
+_KERNELS = {'batch_CLE': 0, 'batch_IoU': 1, 'batch_normalize_CLE': 2}
+_FUSIONS = {None: 0, 'min': 1, 'max': 2}
+_OPS = {'<=': 0, '<': 1, '>': 2}
+
+
+def _maximum(a, b):
+    # np.maximum, NaN wins
+    return a if a>=b or a!=a else b
+
+
+def _minimum(a, b):
+    return a if a<=b or a!=a else b
+
+
+def _score(kernel, r, g, strict, c, cr, cg):
+    # `c` in the common type, `cr` in the type of `r`, `cg` in the type of `g`
+    zero, one = c[0], c[1]
+    if kernel==1:
+        x1, y1, x2, y2 = r[0], r[1], r[2]+r[0]-cr[1], r[3]+r[1]-cr[1]
+        tx1, ty1, tx2, ty2 = g[0], g[1], g[2]+g[0]-cg[1], g[3]+g[1]-cg[1]
+        xx1 = _maximum(tx1, x1)
+        yy1 = _maximum(ty1, y1)
+        xx2 = _minimum(tx2, x2)
+        yy2 = _minimum(ty2, y2)
+        ww = _maximum(zero, xx2 - xx1 + one)
+        hh = _maximum(zero, yy2 - yy1 + one)
+        inter = ww * hh
+        return inter / (r[3]*r[2] + g[3]*g[2] - inter)
+    if strict:
+        cx1, cy1 = (r[2]-cr[1])/cr[2]+r[0], (r[3]-cr[1])/cr[2]+r[1]
+        cx2, cy2 = (g[2]-cg[1])/cg[2]+g[0], (g[3]-cg[1])/cg[2]+g[1]
+    else:
+        cx1, cy1 = r[2]/cr[2]+r[0], r[3]/cr[2]+r[1]
+        cx2, cy2 = g[2]/cg[2]+g[0], g[3]/cg[2]+g[1]
+    if kernel==2:
+        cx1, cy1 = cx1/(g[2]+cg[3]), cy1/(g[3]+cg[3])
+        cx2, cy2 = cx2/(g[2]+cg[3]), cy2/(g[3]+cg[3])
+    dx, dy = cx1-cx2, cy1-cy2
+    return np.sqrt(dx*dx + dy*dy)
+
+
+def _bin(thr, v, right):
+    # np.searchsorted(thr, v, side='right' if right else 'left')
+    lo, hi = 0, len(thr)
+    while lo<hi:
+        mid = (lo+hi)//2
+        if thr[mid]<v or (right and thr[mid]==v):
+            lo = mid+1
+        else:
+            hi = mid
+    return lo
+
+
+def _fused_hist(serial, gt_v, gt_i, invalid, kernel, fusion, strict, lasher, thr, op, consts, c_serial, c_v, c_i):
+    # histogram of the bins of `rgbt.utils.sorted_bins`, `thr` is sorted
+    n = min(len(serial), len(gt_v))
+    hist = np.zeros(len(thr)+1, dtype=np.int64)
+    last = 0
+    for k in range(n):
+        if lasher and k>0 and not (serial[k, 2]<=0 or serial[k, 3]<=0):
+            last = k
+        r = serial[last] if lasher else serial[k]
+        v = _score(kernel, r, gt_v[k], strict, consts, c_serial, c_v)
+        if fusion==1:
+            v = _minimum(v, _score(kernel, serial[k], gt_i[k], strict, consts, c_serial, c_i))
+        elif fusion==2:
+            v = _maximum(v, _score(kernel, serial[k], gt_i[k], strict, consts, c_serial, c_i))
+        if lasher and invalid[k]:
+            v = consts[4]
+        if v!=v:
+            hist[0 if op==2 else len(thr)] += 1
+        else:
+            hist[_bin(thr, v, op==1)] += 1
+    return hist, n
+
+
+if numba!=None:
+    _jit = numba.njit(cache=True, error_model='numpy')
+    _maximum, _minimum = _jit(_maximum), _jit(_minimum)
+    _score = _jit(_score)
+    _bin = _jit(_bin)
+    _fused_hist = _jit(_fused_hist)
+
+
+_BACKENDS = {'numpy': NumpyBackend(), 'numba': NumbaBackend()}
+
+
+def available_backends():
+    return ['numpy', 'numba'] if numba!=None else ['numpy']
+
+
+def set_backend(name:str):
+    """
+    The default backend of the metrics: 'numpy' (the default), 'numba' or 'auto'.
+    """
+    global _default
+    if name not in ('auto',)+tuple(_BACKENDS):
+        raise ValueError(f"Unknown backend: {name}, choose 'auto', 'numpy' or 'numba'.")
+    _default = name
+
+
+def default_backend():
+    return _default
+
+
+def get_backend(name:str=None):
+    """
+    The backend object for `name` (default `set_backend`), numpy when numba is not installed.
+    """
+    name = name or _default
+    if name not in ('auto',)+tuple(_BACKENDS):
+        raise ValueError(f"Unknown backend: {name}, choose 'auto', 'numpy' or 'numba'.")
+    if name=='auto':
+        name = 'numba' if numba!=None else 'numpy'
+    elif name=='numba' and numba==None:
+        warnings.warn("numba is not installed, the metrics are computed with numpy")
+        name = 'numpy'
+    return _BACKENDS[name]
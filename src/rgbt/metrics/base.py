@@ -1,14 +1,376 @@
-
 from rgbt.dataset.basedataset import BaseRGBTDataet, TrackerResult
+from rgbt.utils import BoxConvention, threshold_counts
+from .backend import get_backend, default_backend, set_backend
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+
+def ignore_first_frame(dataset:BaseRGBTDataet, result:TrackerResult, seq_name):
+    """
+    Replace the first result box by the ground truth, return (gt, result boxes).
+    The visible ground truth is used for the datasets with two modalities.
+    """
+    gt = dataset[seq_name]
+    if isinstance(gt, dict):
+        gt = gt['visible']
+    serial = result[seq_name]
+    if not np.array_equal(serial[0], gt[0]):
+        serial = result.set_box(seq_name, 0, gt[0])     # ignore the first frame
+        # the raw scores of this sequence were computed with the old box
+        dataset.forget_scores(result, seq_name)
+    return gt, serial
+
+
+def lasher_boxes(serial, gt):
+    """
+    Cut the result to the ground truth and replace every box with a width or height <= 0
+    by the last valid box before it (the first box is kept as it is).
+    """
+    serial = np.asarray(serial)[:len(gt)]
+    if len(serial)==0:
+        return serial.copy()
+    invalid = (serial[:, 2]<=0) | (serial[:, 3]<=0)
+    invalid[0] = False
+    # index of the last valid box up to each frame, the gather copies the boxes
+    last = np.maximum.accumulate(np.where(invalid, 0, np.arange(len(serial))))
+    return serial[last]
+
+
+def lasher_scores(kernel, serial, gt, invalid=None):
+    """
+    `kernel` on the LasHeR boxes (see `lasher_boxes`), frames with an invalid ground truth score -1.
+    `serial` can also hold the filled boxes of several trackers, shape (T, len(gt), 4).
+
+    [in] invalid - ndarray
+        The frames with an invalid ground truth, default `(gt<=0).any(axis=1)`,
+        see `BaseRGBTDataet.gt_invalid`.
+    """
+    if np.ndim(serial)==2:
+        serial = lasher_boxes(serial, gt)
+    if invalid is None:
+        invalid = (gt<=0).any(axis=1)
+    res = kernel(serial, gt)
+    res[..., invalid[:res.shape[-1]]] = -1
+    return res
+
+
+class MetricResult(tuple):
+    """
+    (value, curve) of a metric, `backend` is the name of the backend that computed it.
+    """
+    def __new__(cls, value, curve, backend:str):
+        self = super().__new__(cls, (value, curve))
+        self.backend = backend
+        return self
+
+    def __reduce__(self):
+        return (MetricResult, (self[0], self[1], self.backend))
+
+
+# dataset and results of a worker process, set once by `_init_worker`
+_worker = {}
+
+
+def _init_worker(dataset:BaseRGBTDataet, results:dict, backend:str):
+    _worker['dataset'] = dataset
+    _worker['results'] = results
+    set_backend(backend)
+
+
+def _evaluate_chunk(metric, tracker_name, seqs:list):
+    dataset, result = _worker['dataset'], _worker['results'][tracker_name]
+    counts, frames = metric.states(dataset, result, seqs)
+    # the per-frame scores go back to fill the memo of the main process
+    return counts, frames, dataset.memo_scores(result, seqs)
 
 
 class Metric:
-    def __init__(self) -> None:
-        pass
+    """
+    A metric is computed per sequence as the number of frames passing every
+    threshold (`seq_state`), and `reduce` turns the counts of all sequences
+    into the score and the curve.
+
+    The per-frame scores come from `kernel` (an array kernel of `rgbt.utils`), and `variant` says
+    how the result is prepared: 'raw' scores each modality, 'first_frame' replaces the first box
+    by the ground truth, 'lasher' also repeats the previous box for invalid boxes. A frame passes
+    a threshold when `score <op> thr`.
+
+    The pixel convention of the kernel is the metric's `convention`, or else the one of the
+    dataset (see `rgbt.utils.BoxConvention`), resolved by `dataset_kernel`.
+
+    'raw' metrics combine the scores of the two modalities per frame with `fusion`, 'min' or 'max'.
+    `backend` chooses how the counts are computed, see `rgbt.metrics.backend`.
+
+    A precision metric reports its curve at `thr[value_index]`, a success metric reports the
+    area under its curve and `success_thr` is its usual single threshold, see `value_thr`.
+    The sequences are averaged, or with `frame_weighted` (GTOT) every frame counts the same.
+    """
+    kernel = None
+    variant = 'raw'
+    op = '<='
+    fusion = None
+    value_index = None
+    success_thr = None
+    frame_weighted = False
+
+    def __init__(self, convention:BoxConvention=None, backend:str=None) -> None:
+        self.convention = convention
+        self.backend = backend
+
+
+    def eval_strict(self, dataset:BaseRGBTDataet):
+        convention = self.convention if self.convention!=None else dataset.convention
+        return convention.eval_strict
+
+
+    def value_thr(self):
+        """
+        The threshold of the reported value, `thr[value_index]` (e.g. 20 pixels, 5 for GTOT),
+        else `success_thr`. None when the metric has neither.
+        """
+        if self.value_index!=None:
+            return float(np.asarray(self.thr)[self.value_index])
+        return self.success_thr
+
+
+    def dataset_kernel(self, dataset:BaseRGBTDataet):
+        """
+        `kernel` with the pixel convention bound for `dataset`.
+        """
+        return partial(self.kernel, strict=self.eval_strict(dataset))
+
+
+    def score_key(self, dataset:BaseRGBTDataet, modality=None):
+        """
+        Key of the per-frame scores in the dataset memo.
+        """
+        return (self.kernel.__name__, modality, self.variant, self.eval_strict(dataset))
+
+
+    def scores(self, dataset:BaseRGBTDataet, result:TrackerResult, seq_name, modality=None):
+        """
+        Per-frame scores of one sequence, memoized on the dataset (see `BaseRGBTDataet.frame_scores`).
+        A 'raw' metric gives the modality of the ground truth, the others use the visible (or only) one.
+        """
+        key = self.score_key(dataset, modality)
+        kernel = self.dataset_kernel(dataset)
+        if self.variant=='raw':
+            return dataset.frame_scores(result, seq_name, key, lambda: kernel(result[seq_name], dataset[seq_name][modality]))
+        gt, serial = ignore_first_frame(dataset, result, seq_name)
+        if self.variant=='lasher':
+            return dataset.frame_scores(result, seq_name, key, lambda: lasher_scores(
+                kernel, self.filled_boxes(dataset, result, seq_name), gt, dataset.gt_invalid(seq_name)))
+        return dataset.frame_scores(result, seq_name, key, lambda: kernel(serial, gt))
+
+
+    def filled_boxes(self, dataset:BaseRGBTDataet, result:TrackerResult, seq_name):
+        """
+        The filled boxes of `lasher_boxes`, call after `ignore_first_frame`. They are computed
+        again by every metric and not memoized, only the per-frame scores are.
+        """
+        gt = dataset[seq_name]
+        if isinstance(gt, dict):
+            gt = gt['visible']
+        return lasher_boxes(result[seq_name], gt)
+
+
+    def batch_scores(self, dataset:BaseRGBTDataet, results:list, seq_name):
+        """
+        Compute the missing per-frame scores of one sequence for several trackers with one
+        kernel call on a (T, N, 4) stack, and put them in the dataset memo. Trackers are
+        stacked by number of frames and dtype, so every value is the one of `scores`.
+        """
+        modalities = ('visible', 'infrared') if self.variant=='raw' else (None,)
+        kernel = self.dataset_kernel(dataset)
+        for modality in modalities:
+            key = self.score_key(dataset, modality)
+            todo = [result for result in results if not dataset.has_frame_scores(result, seq_name, key)]
+            if not todo:
+                continue
+            groups = {}
+            for result in todo:
+                if self.variant=='raw':
+                    gt, serial = dataset[seq_name][modality], result[seq_name]
+                else:
+                    gt, serial = ignore_first_frame(dataset, result, seq_name)
+                    if self.variant=='lasher':
+                        serial = self.filled_boxes(dataset, result, seq_name)
+                serial = np.atleast_2d(serial)
+                n = min(len(serial), len(gt))
+                groups.setdefault((n, serial.dtype), []).append((result, serial[:n]))
+            for members in groups.values():
+                stack = np.stack([serial for _, serial in members])
+                if self.variant=='lasher':
+                    res = lasher_scores(kernel, stack, gt, dataset.gt_invalid(seq_name))
+                else:
+                    res = kernel(stack, gt)
+                for (result, _), row in zip(members, res):
+                    dataset.frame_scores(result, seq_name, key, lambda: row)
+
+
+    def frame_values(self, dataset:BaseRGBTDataet, result:TrackerResult, seq_name):
+        """
+        The value of every frame compared with the thresholds. 'raw' metrics combine the
+        scores of the two modalities here.
+        """
+        if self.fusion=='min':
+            return np.minimum(self.scores(dataset, result, seq_name, 'visible'), self.scores(dataset, result, seq_name, 'infrared'))
+        if self.fusion=='max':
+            return np.maximum(self.scores(dataset, result, seq_name, 'visible'), self.scores(dataset, result, seq_name, 'infrared'))
+        return self.scores(dataset, result, seq_name)
+
+
+    def fused_inputs(self, dataset:BaseRGBTDataet, result:TrackerResult, seq_name):
+        """
+        (result boxes, visible gt, infrared gt, invalid gt mask) of one sequence for a backend
+        that scores the boxes itself, the first box is replaced as for `scores`.
+        """
+        if self.variant=='raw':
+            gt = dataset[seq_name]
+            return np.atleast_2d(result[seq_name]), gt['visible'], gt['infrared'], np.zeros(0, dtype=bool)
+        gt, serial = ignore_first_frame(dataset, result, seq_name)
+        invalid = dataset.gt_invalid(seq_name) if self.variant=='lasher' else np.zeros(0, dtype=bool)
+        return np.atleast_2d(serial), gt, gt, invalid
+
+
+    def backend_name(self):
+        return get_backend(self.backend).name
+
+
+    def seq_state(self, dataset:BaseRGBTDataet, result:TrackerResult, seq_name):
+        """
+        Return the counts at each threshold, shape (len(thr),), and the number of frames.
+        """
+        return get_backend(self.backend).seq_state(self, dataset, result, seq_name)
+
+
+    def reduce(self, counts, frames):
+        """
+        The value and the curve of the sequences.
+
+        [in] counts - ndarray
+            Shape (len(seqs), len(thr)).
+        [in] frames - ndarray
+            Shape (len(seqs),).
+        """
+        if self.frame_weighted:
+            # GTOT weights every frame equally
+            all_frame_num = frames.sum()
+            if self.value_index!=None:
+                value = counts[:, self.value_index].sum()/all_frame_num
+            else:
+                a = (counts[:, 1:]*self.thr[1]).sum()   # calc auc
+                b = (counts[:, :-1]*self.thr[1]).sum()
+                value = (a+b)/2./all_frame_num
+            return value, counts/all_frame_num*counts.shape[0]
+        curve = counts/frames[:, None]
+        if self.value_index!=None:
+            return curve.mean(axis=0)[self.value_index], curve
+        return curve.mean(), curve
+
+
+    def seq_terms(self, counts, frames):
+        """
+        Split the value of `reduce` over the sequences: (num, den) of shape (..., len(seqs))
+        with value = num.sum(-1)/den.sum(-1). Used to resample sequences, see `rgbt.metrics.stats`.
+        `counts` and `frames` may have leading axes, e.g. trackers.
+        """
+        if self.frame_weighted:
+            if self.value_index!=None:
+                return counts[..., self.value_index], frames
+            a = (counts[..., 1:]*self.thr[1]).sum(axis=-1)
+            b = (counts[..., :-1]*self.thr[1]).sum(axis=-1)
+            return (a+b)/2., frames
+        if self.value_index!=None:
+            return counts[..., self.value_index]/frames, np.ones(frames.shape)
+        return (counts/frames[..., None]).mean(axis=-1), np.ones(frames.shape)
+
+
+    def states(self, dataset:BaseRGBTDataet, result:TrackerResult, seqs:list):
+        """
+        Counts and frame numbers of the sequences, read from `dataset.metric_cache` when possible.
+        """
+        cache = getattr(dataset, 'metric_cache', None)
+        counts, frames = [], []
+        for seq_name in seqs:
+            if cache!=None:
+                c, n = cache.seq_state(self, dataset, result, seq_name)
+            else:
+                c, n = self.seq_state(dataset, result, seq_name)
+            counts.append(c)
+            frames.append(n)
+        if cache!=None:
+            cache.commit()
+        counts = np.array(counts).reshape(len(frames), len(self.thr))
+        return counts, np.array(frames, dtype=np.int64)
+
+
+    def __call__(self, dataset:BaseRGBTDataet, result:TrackerResult, seqs:list):
+        counts, frames = self.states(dataset, result, seqs)
+        return MetricResult(*self.reduce(counts, frames), self.backend_name())
+
+
+    def evaluate(self, dataset:BaseRGBTDataet, results:dict, seqs:list, workers=None):
+        """
+        Evaluate several trackers, {tracker_name: (value, curve)} as calling the metric on each.
+        The per-frame scores of every sequence are computed for all trackers at once.
+
+        [in] workers - int
+            Split the work by (tracker, sequence chunk) over a pool of `workers` processes.
+            The per-sequence counts are reduced in sequence order, so the values are the
+            same as a serial run, and the per-frame scores are added to the dataset memo.
+        """
+        backend = self.backend_name()
+        states = self.evaluate_states(dataset, results, seqs, workers)
+        return {name: MetricResult(*self.reduce(counts, frames), backend) for name, (counts, frames) in states.items()}
+
+
+    def evaluate_states(self, dataset:BaseRGBTDataet, results:dict, seqs:list, workers=None):
+        """
+        {tracker_name: (counts, frames)} of several trackers, see `states` and `evaluate`.
+        """
+        if workers!=None and workers>1 and len(results)*len(seqs)>1:
+            return self._evaluate_pool(dataset, results, seqs, workers)
+        if getattr(dataset, 'metric_cache', None)!=None or not get_backend(self.backend).batched:
+            return {name: self.states(dataset, result, seqs) for name, result in results.items()}
+
+        results = list(results.items())
+        if not results:
+            return {}
+        counts = np.zeros((len(results), len(seqs), len(self.thr)), dtype=np.int64)
+        frames = np.zeros((len(results), len(seqs)), dtype=np.int64)
+        for j, seq_name in enumerate(seqs):
+            self.batch_scores(dataset, [result for _, result in results], seq_name)
+            values = [self.frame_values(dataset, result, seq_name) for _, result in results]
+            offsets = np.zeros(len(values)+1, dtype=np.int64)
+            np.cumsum([len(res) for res in values], out=offsets[1:])
+            # one histogram for the sequence of all trackers
+            counts[:, j] = threshold_counts(np.concatenate(values), self.thr, self.op, offsets)
+            frames[:, j] = np.diff(offsets)
+        return {name: (counts[t], frames[t]) for t, (name, _) in enumerate(results)}
+
 
-    def __call__(self, dataset:BaseRGBTDataet, res:TrackerResult):
-        pass
+    def _evaluate_pool(self, dataset:BaseRGBTDataet, results:dict, seqs:list, workers:int):
+        seqs = list(seqs)
+        n_chunks = max(1, min(len(seqs), -(-workers*4//len(results))))
+        bounds = np.linspace(0, len(seqs), n_chunks+1).astype(int)
+        chunks = [seqs[a:b] for a, b in zip(bounds[:-1], bounds[1:]) if b>a]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(dataset, results, default_backend())) as pool:
+            futures = {name: [pool.submit(_evaluate_chunk, self, name, chunk) for chunk in chunks] for name in results}
+            outputs = {name: [f.result() for f in fs] for name, fs in futures.items()}
 
+        res = {}
+        for name, result in results.items():
+            if self.variant!='raw':
+                # the workers replaced the first boxes of their copies, do the same here
+                for seq_name in seqs:
+                    ignore_first_frame(dataset, result, seq_name)
+            for _, _, memo in outputs[name]:
+                for key, scores in memo.items():
+                    dataset.frame_scores(result, key[0], key[1:], lambda: scores)
+            counts = np.concatenate([counts for counts, _, _ in outputs[name]], axis=0)
+            frames = np.concatenate([frames for _, frames, _ in outputs[name]], axis=0)
+            res[name] = (counts, frames)
+        return res
 
-    def __call__(self, dataset:BaseRGBTDataet):
-        self(dataset, dataset.trackers)
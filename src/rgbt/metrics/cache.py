@@ -0,0 +1,208 @@
+"""
+Persistent metric cache.
+
+The per-sequence state of a metric (threshold counts and frame number) is stored
+in a sqlite file, keyed by a hash of everything it depends on: the converted
+result boxes of the sequence, its ground truth, the metric and its thresholds
+and the pixel convention of the metric. Re-running a leaderboard then only
+computes the sequences that are new or changed.
+
+    dataset.metric_cache = MetricCache()
+    dataset.MPR()       # computed
+    dataset.MPR()       # read from the cache
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import weakref
+import numpy as np
+from rgbt.dataset.result_source import ResultLoadError, ARCHIVE_EXTS
+
+
+CACHE_VERSION = 1
+CACHE_DIR_ENV = 'RGBT_CACHE_DIR'
+
+
+def _update_digest(h, serial):
+    if isinstance(serial, dict):
+        for k in sorted(serial):
+            h.update(k.encode())
+            _update_digest(h, serial[k])
+    else:
+        a = np.ascontiguousarray(np.asarray(serial))
+        h.update(f'{a.dtype}{a.shape}'.encode())
+        h.update(a.tobytes())
+
+
+def serial_digest(serial):
+    """
+    Content hash of the boxes of one sequence (a list/array of boxes, or a dict of them).
+    """
+    h = hashlib.sha1()
+    _update_digest(h, serial)
+    return h.hexdigest()
+
+
+def default_cache_path():
+    root = os.environ.get(CACHE_DIR_ENV) or os.path.join(os.path.expanduser('~'), '.cache', 'rgbt')
+    return os.path.join(root, 'metrics.sqlite')
+
+
+class MetricCache:
+    """
+    [in] path - str
+        The sqlite file, default `$RGBT_CACHE_DIR/metrics.sqlite` or `~/.cache/rgbt/metrics.sqlite`.
+    """
+    def __init__(self, path:str=None) -> None:
+        self.path = path or default_cache_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._gt_digests = weakref.WeakKeyDictionary()
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS states (key TEXT PRIMARY KEY, counts BLOB, dtype TEXT, frames INTEGER)")
+
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn==None:
+            conn = sqlite3.connect(self.path, timeout=60)
+            self._local.conn = conn
+        return conn
+
+
+    def __getstate__(self):
+        # connections and digests stay in their process
+        state = self.__dict__.copy()
+        del state['_local'], state['_gt_digests']
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+        self._gt_digests = weakref.WeakKeyDictionary()
+
+
+    def gt_digest(self, dataset, seq_name):
+        digests = self._gt_digests.setdefault(dataset, {})
+        if seq_name not in digests:
+            digests[seq_name] = serial_digest(dataset[seq_name])
+        return digests[seq_name]
+
+
+    def key(self, metric, dataset, result, seq_name):
+        h = hashlib.sha1()
+        h.update(f'v{CACHE_VERSION}|{type(metric).__module__}.{type(metric).__qualname__}|strict={metric.eval_strict(dataset)}|'.encode())
+        h.update(np.asarray(metric.thr, dtype=np.float64).tobytes())
+        h.update(self.gt_digest(dataset, seq_name).encode())
+        serial = result[seq_name]
+        if metric.variant!='raw':
+            serial = serial[1:]     # overwritten by the ground truth, possibly already by an earlier metric
+        h.update(serial_digest(serial).encode())
+        return h.hexdigest()
+
+
+    def get(self, key:str):
+        row = self._connect().execute("SELECT counts, dtype, frames FROM states WHERE key=?", (key,)).fetchone()
+        if row==None:
+            return None
+        return np.frombuffer(row[0], dtype=row[1]).copy(), row[2]
+
+
+    def put(self, key:str, counts, frames):
+        counts = np.ascontiguousarray(counts)
+        self._connect().execute("INSERT OR REPLACE INTO states VALUES (?, ?, ?, ?)",
+                                (key, counts.tobytes(), str(counts.dtype), int(frames)))
+
+
+    def commit(self):
+        self._connect().commit()
+
+
+    def seq_state(self, metric, dataset, result, seq_name):
+        """
+        `metric.seq_state` through the cache.
+        """
+        key = self.key(metric, dataset, result, seq_name)
+        state = self.get(key)
+        if state!=None:
+            self.hits += 1
+            return state
+        self.misses += 1
+        counts, frames = metric.seq_state(dataset, result, seq_name)
+        self.put(key, counts, frames)
+        return counts, frames
+
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM states")
+        self.hits = self.misses = 0
+
+
+    def watch(self, dataset, root:str, metrics, bbox_type='ltwh', prefix='', interval=10., rounds=None, callback=None):
+        """
+        Poll a results directory and evaluate every tracker whose files changed.
+        Each entry of `root` is one tracker: a directory of result files or an archive.
+        A tracker is (re)registered once all its sequences can be read, and only its
+        new or changed sequences are computed, the rest come from the cache.
+
+        [in] metrics - str | list
+            Names of the dataset metrics, e.g. 'MPR', ['MPR', 'MSR'] or ['PR', 'SR', 'NPR'].
+        [in] callback - callable
+            Called as callback(tracker_name, {metric: (value, curve)}), default prints the values.
+        [in] rounds - int
+            Stop after this many polls, default runs until interrupted.
+
+        Returns
+        -------
+        {tracker_name: {metric: (value, curve)}} with the latest scores.
+        """
+        if callback==None:
+            callback = lambda name, scores: print(name, {k: round(float(v[0]), 4) for k,v in scores.items()})
+        if isinstance(metrics, str):
+            metrics = [metrics]
+        dataset.metric_cache = self
+        seen = {}
+        scores = {}
+        n = 0
+        while True:
+            for entry in sorted(os.scandir(root), key=lambda e: e.name):
+                signature = _signature(entry)
+                if signature==None or seen.get(entry.name)==signature:
+                    continue
+                tracker_name = _tracker_name(entry.name)
+                try:
+                    dataset(tracker_name, entry.path, prefix=prefix, bbox_type=bbox_type)
+                except (ResultLoadError, OSError, ValueError):
+                    continue    # not complete yet, try again on the next poll
+                seen[entry.name] = signature
+                scores[tracker_name] = {m: getattr(dataset, m)(tracker_name) for m in metrics}
+                callback(tracker_name, scores[tracker_name])
+            n += 1
+            if rounds!=None and n>=rounds:
+                return scores
+            time.sleep(interval)
+
+
+def _tracker_name(name:str):
+    for ext in ARCHIVE_EXTS + ('.npz',):
+        if name.lower().endswith(ext):
+            return name[:-len(ext)]
+    return name
+
+
+def _signature(entry):
+    try:
+        if entry.is_dir():
+            return tuple(sorted((e.name, e.stat().st_size, e.stat().st_mtime_ns) for e in os.scandir(entry.path) if e.is_file()))
+        if entry.name.lower().endswith(ARCHIVE_EXTS + ('.npz',)):
+            st = entry.stat()
+            return (st.st_size, st.st_mtime_ns)
+    except OSError:
+        pass
+    return None
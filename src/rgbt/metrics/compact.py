@@ -0,0 +1,104 @@
+"""
+Accuracy check of the compact box storage.
+
+Trackers registered with `compact=True` keep their boxes as int16/int32 and the
+metrics compute in float32. `compact_report` evaluates every metric of the dataset
+again on float64 copies of the ground truth and the results and reports the
+largest deviation of the value or the curve. The float32 path itself differs from
+float64 by a few frames when a score lands on a threshold (e.g. an IoU of 0.5),
+the compact storage adds nothing to it: against uncompacted float32 copies the
+deviation is 0.
+
+    rgbt234("APFNet", "./result/RGBT234/APFNet", bbox_type="corner", compact=True)
+    compact_report(rgbt234)                         # {'MPR': 0.0, 'MSR': 0.0024}
+    compact_report(rgbt234, reference='float32')    # {'MPR': 0.0, 'MSR': 0.0}
+"""
+import copy
+import warnings
+import numpy as np
+from rgbt.dataset.basedataset import BaseRGBTDataet
+from rgbt.dataset.ragged import RaggedBoxes, ModalityBoxes
+from .base import Metric
+
+
+def dataset_metrics(dataset:BaseRGBTDataet, names=None):
+    """
+    {name: metric} of a dataset, e.g. {'MPR': MPR(), 'MSR': MSR()} for RGBT234.
+
+    [in] names - str | list
+        Keep only these metrics, one name or a list of names. Default all.
+    """
+    funs = {name[:-len('_fun')]: fun for name, fun in vars(dataset).items() if name.endswith('_fun') and isinstance(fun, Metric)}
+    if names==None:
+        return funs
+    if isinstance(names, str):
+        names = [names]
+    unknown = [name for name in names if name not in funs]
+    if unknown:
+        raise ValueError(f"Unknown metric: {', '.join(map(str, unknown))}, choose from {', '.join(funs)}.")
+    return {name: funs[name] for name in names}
+
+
+def _astype(boxes, dtype):
+    if isinstance(boxes, ModalityBoxes):
+        return ModalityBoxes({m: _astype(ragged, dtype) for m, ragged in boxes.modalities.items()})
+    return boxes.map(lambda b: b.astype(dtype))
+
+
+def _reference_dataset(dataset:BaseRGBTDataet, dtype):
+    ref = copy.copy(dataset)
+    ref.seqs_gt = _astype(dataset.seqs_gt, dtype)
+    ref.trackers = {}
+    ref.metric_cache = None
+    ref._score_memo = {}
+    ref._gt_invalid = None
+    return ref
+
+
+def _reference_result(result, dtype):
+    ref = copy.copy(result)
+    ref.seqs_result = RaggedBoxes.from_arrays(result.seqs_name, [np.array(result[seq_name], dtype=dtype) for seq_name in result.seqs_name])
+    return ref
+
+
+def compact_report(dataset:BaseRGBTDataet, tracker_names=None, seqs=None, metrics=None, reference='float64', tol=1e-2):
+    """
+    Largest deviation of the metric values and curves (averaged over the sequences)
+    from an evaluation on uncompacted copies.
+
+    [in] tracker_names - list
+        Default is all registered trackers.
+    [in] metrics - str | list
+        Names of the dataset metrics, default all of them (see `dataset_metrics`).
+    [in] reference - str
+        'float64', or 'float32' to check that the compact storage itself changes nothing.
+    [in] tol - float
+        A warning is issued for the metrics deviating more.
+
+    Returns
+    -------
+    {metric: deviation}, the maximum over the trackers.
+    """
+    if seqs==None:
+        seqs = dataset.seqs_name
+    if tracker_names==None:
+        tracker_names = list(dataset.trackers)
+    funs = dataset_metrics(dataset, metrics)
+
+    ref = _reference_dataset(dataset, reference)
+    report = {name: 0. for name in funs}
+    for tracker_name in tracker_names:
+        result = dataset.trackers[tracker_name]
+        # copied before any metric runs, so both sides replace the first boxes in the same order
+        ref_result = _reference_result(result, reference)
+        for name, fun in funs.items():
+            value, curve = fun(dataset, result, seqs)
+            ref_value, ref_curve = fun(ref, ref_result, seqs)
+            # the value and the plotted curve (mean over the sequences)
+            deviation = max(abs(float(value)-float(ref_value)),
+                            float(np.max(np.abs(np.mean(curve, axis=0)-np.mean(ref_curve, axis=0)), initial=0.)))
+            report[name] = max(report[name], deviation)
+    for name, deviation in report.items():
+        if deviation>tol:
+            warnings.warn(f"{name} of the compact boxes deviates by {deviation:.3g} from {reference}")
+    return report
@@ -20,28 +20,14 @@ class MPR(Metric):
     thermal modalities, and adopt the smaller distance to compute the precision. 
     We set the threshold to be 20 pixels to obtain the representative MPR.
     """
-    def __init__(self, thr=np.linspace(0, 50, 51)) -> None:
-        super().__init__()
-        self.thr = thr
-
-
-    def __call__(self, dataset:BaseRGBTDataet, result:TrackerResult, seqs:list):
-        pr=[]
-        for seq_name in seqs:
-            gt_v = dataset[seq_name]['visible']
-            gt_i = dataset[seq_name]['infrared']
-            serial = result[seq_name]
-            res_v = np.array(serial_process(CLE, serial, gt_v))
-            res_i = np.array(serial_process(CLE, serial, gt_i))
-            res = np.minimum(res_v, res_i)
+    kernel = staticmethod(batch_CLE)
+    op = '<='
+    fusion = 'min'
+    value_index = 20
 
-            pr_cell = []
-            for i in self.thr:
-                pr_cell.append(np.sum(res<=i)/len(res))
-            pr.append(pr_cell)
-        pr = np.array(pr)
-        pr_val = pr.mean(axis=0)[20]
-        return pr_val, pr
+    def __init__(self, thr=np.linspace(0, 50, 51), convention=None, backend=None) -> None:
+        super().__init__(convention, backend)
+        self.thr = thr
 
 
 
@@ -54,30 +40,14 @@ class MSR(Metric):
     rate (MSR) to measure the tracker results. By varying the threshold, the MSR plot can 
     be obtained, and we employ the area under curve of MSR plot to define the representative MSR.
     """
-    def __init__(self, thr=np.linspace(0, 1, 21)) -> None:
-        super().__init__()
-        self.thr = thr
+    kernel = staticmethod(batch_IoU)
+    op = '>'
+    fusion = 'max'
+    success_thr = 0.5
 
-
-    def __call__(self, dataset:BaseRGBTDataet, result:TrackerResult, seqs:list):
-    
-        sr=[]
-        for seq_name in seqs:
-            gt_v = dataset[seq_name]['visible']
-            gt_i = dataset[seq_name]['infrared']
-            serial = result[seq_name]
-            res_v = np.array(serial_process(IoU, serial, gt_v))
-            res_i = np.array(serial_process(IoU, serial, gt_i))
-            res = np.maximum(res_v, res_i)
-
-            sr_cell = []
-            for i in self.thr:
-                sr_cell.append(np.sum(res>i)/len(res))
-            sr.append(sr_cell)
-
-        sr = np.array(sr)
-        sr_val = sr.mean()
-        return sr_val, sr
+    def __init__(self, thr=np.linspace(0, 1, 21), convention=None, backend=None) -> None:
+        super().__init__(convention, backend)
+        self.thr = thr
 
 
 
@@ -95,31 +65,15 @@ class MPR_GTOT(Metric):
     thermal modalities, and adopt the smaller distance to compute the precision. 
     We set the threshold to be 20 pixels to obtain the representative MPR.
     """
-    def __init__(self, thr=np.linspace(0, 25, 51)) -> None:
-        super().__init__()
-        self.thr = thr
-
-
-    def __call__(self, dataset:BaseRGBTDataet, result:TrackerResult, seqs:list):
-        pr=[]
-        all_frame_num = 0
-        for seq_name in seqs:
-            gt_v = dataset[seq_name]['visible']
-            gt_i = dataset[seq_name]['infrared']
-            serial = result[seq_name]
-            res_v = np.array(serial_process(CLE, serial, gt_v))
-            res_i = np.array(serial_process(CLE, serial, gt_i))
-            res = np.minimum(res_v, res_i)
+    kernel = staticmethod(batch_CLE)
+    op = '<'
+    fusion = 'min'
+    value_index = 10
+    frame_weighted = True
 
-            pr_cell = []
-            all_frame_num+=len(res)
-            for i in self.thr:
-                pr_cell.append(np.sum(res<i))
-            pr.append(pr_cell)
-
-        pr = np.array(pr)
-        pr_val = pr[:, 10].sum()/all_frame_num
-        return pr_val, pr/all_frame_num*pr.shape[0]
+    def __init__(self, thr=np.linspace(0, 25, 51), convention=None, backend=None) -> None:
+        super().__init__(convention, backend)
+        self.thr = thr
 
 
 
@@ -132,36 +86,15 @@ class MSR_GTOT(Metric):
     rate (MSR) to measure the tracker results. By varying the threshold, the MSR plot can 
     be obtained, and we employ the area under curve of MSR plot to define the representative MSR.
     """
-    def __init__(self, thr=np.linspace(0, 1, 21)) -> None:
-        super().__init__()
-        self.thr = thr
-
+    kernel = staticmethod(batch_IoU)
+    op = '>'
+    fusion = 'max'
+    success_thr = 0.5
+    frame_weighted = True
 
-    def __call__(self, dataset:BaseRGBTDataet, result:TrackerResult, seqs:list):
-    
-        sr=[]
-        all_frame_num=0
-        for seq_name in seqs:
-            gt_v = dataset[seq_name]['visible']
-            gt_i = dataset[seq_name]['infrared']
-            serial = result[seq_name]
-            res_v = np.array(serial_process(IoU, serial, gt_v))
-            res_i = np.array(serial_process(IoU, serial, gt_i))
-            res = np.maximum(res_v, res_i)
-
-            sr_cell = []
-            all_frame_num+=len(res)
-            for i in self.thr:
-                sr_cell.append(np.sum(res>i))
-            sr.append(sr_cell)
-
-        sr = np.array(sr)
-        sr_val = 0
-        a = (sr[:, 1:]*self.thr[1]).sum()   # calc auc
-        b = (sr[:, :-1]*self.thr[1]).sum()
-        sr_val += (a+b)/2.
-        sr_val = sr_val/all_frame_num
-        return sr_val, sr/all_frame_num*sr.shape[0]
+    def __init__(self, thr=np.linspace(0, 1, 21), convention=None, backend=None) -> None:
+        super().__init__(convention, backend)
+        self.thr = thr
 
 
 
@@ -169,33 +102,14 @@ class PR(Metric):
     """
     Precision Rate.
     """
-    def __init__(self, thr=np.linspace(0, 50, 51)) -> None:
-        super().__init__()
-        self.thr = thr
-
-
-    def __call__(self, dataset:BaseRGBTDataet, result:TrackerResult, seqs:list):
-        pr=[]
-        for seq_name in seqs:
-            try:
-                gt = dataset[seq_name]
-                serial = result[seq_name]
-                serial[0] = gt[0]       # ignore the first frame
-            except:
-                gt = dataset[seq_name]['visible']
-                serial = result[seq_name]
-                serial[0] = gt[0]       # ignore the first frame
-            res = np.array(serial_process(CLE, serial, gt))
-
-            pr_cell = []
-            for i in self.thr:
-                pr_cell.append(np.sum(res<=i)/len(res))
-            pr.append(pr_cell)
-            
-        pr = np.array(pr)
-        pr_val = pr.mean(axis=0)[20]
-        return pr_val, pr
+    kernel = staticmethod(batch_CLE)
+    op = '<='
+    variant = 'first_frame'
+    value_index = 20
 
+    def __init__(self, thr=np.linspace(0, 50, 51), convention=None, backend=None) -> None:
+        super().__init__(convention, backend)
+        self.thr = thr
 
 
 
@@ -204,33 +118,14 @@ class SR(Metric):
     """
     Success Rate.
     """
-    def __init__(self, thr=np.linspace(0, 1, 21)) -> None:
-        super().__init__()
-        self.thr = thr
+    kernel = staticmethod(batch_IoU)
+    op = '>'
+    variant = 'first_frame'
+    success_thr = 0.5
 
-
-    def __call__(self, dataset:BaseRGBTDataet, result:TrackerResult, seqs:list):
-    
-        sr=[]
-        for seq_name in seqs:
-            try:
-                gt = dataset[seq_name]
-                serial = result[seq_name]
-                serial[0] = gt[0]       # ignore the first frame
-            except:
-                gt = dataset[seq_name]['visible']
-                serial = result[seq_name]
-                serial[0] = gt[0]       # ignore the first frame
-            res = np.array(serial_process(IoU, serial, gt))
-
-            sr_cell = []
-            for i in self.thr:
-                sr_cell.append(np.sum(res>i)/len(res))
-            sr.append(sr_cell)
-
-        sr = np.array(sr)
-        sr_val = sr.mean()
-        return sr_val, sr
+    def __init__(self, thr=np.linspace(0, 1, 21), convention=None, backend=None) -> None:
+        super().__init__(convention, backend)
+        self.thr = thr
 
 
 class SR_LasHeR(Metric):
@@ -238,43 +133,14 @@ class SR_LasHeR(Metric):
     Success Rate.
     Different other dataset, LasHeR testingset need to filter some results.
     """
-    def __init__(self, thr=np.linspace(0, 1, 21)) -> None:
-        super().__init__()
-        self.thr = thr
-
+    kernel = staticmethod(batch_IoU)
+    op = '>'
+    variant = 'lasher'
+    success_thr = 0.5
 
-    def __call__(self, dataset:BaseRGBTDataet, result:TrackerResult, seqs:list):
-    
-        sr=[]
-        for seq_name in seqs:
-            try:
-                gt = dataset[seq_name]
-                serial = result[seq_name]
-                serial[0] = gt[0]       # ignore the first frame
-            except:
-                gt = dataset[seq_name]['visible']
-                serial = result[seq_name]
-                serial[0] = gt[0]       # ignore the first frame
-            # cut off tracking result
-            serial = serial[:len(gt)]   
-            # handle the invailded tracking result
-            for i in range(1, len(gt)):
-                if serial[i][2]<=0 or serial[i][3]<=0:
-                    serial[i] = serial[i-1].copy()
-            res = np.array(serial_process(IoU, serial, gt))
-
-            for i in range(len(gt)):
-                if sum(gt[i]<=0):
-                    res[i]=-1
-
-            sr_cell = []
-            for i in self.thr:
-                sr_cell.append(np.sum(res>i)/len(res))
-            sr.append(sr_cell)
-
-        sr = np.array(sr)
-        sr_val = sr.mean()
-        return sr_val, sr
+    def __init__(self, thr=np.linspace(0, 1, 21), convention=None, backend=None) -> None:
+        super().__init__(convention, backend)
+        self.thr = thr
     
 
 class PR_LasHeR(Metric):
@@ -282,81 +148,25 @@ class PR_LasHeR(Metric):
     Precision Rate.
     Different other dataset, LasHeR testingset need to filter some results.
     """
-    def __init__(self, thr=np.linspace(0, 50, 51)) -> None:
-        super().__init__()
-        self.thr = thr
+    kernel = staticmethod(batch_CLE)
+    op = '<='
+    variant = 'lasher'
+    value_index = 20
 
-
-    def __call__(self, dataset:BaseRGBTDataet, result:TrackerResult, seqs:list):
-        pr=[]
-        for seq_name in seqs:
-            try:
-                gt = dataset[seq_name]
-                serial = result[seq_name]
-                serial[0] = gt[0]       # ignore the first frame
-            except:
-                gt = dataset[seq_name]['visible']
-                serial = result[seq_name]
-                serial[0] = gt[0]       # ignore the first frame
-            # cut off tracking result
-            serial = serial[:len(gt)]   
-            # handle the invailded tracking result
-            for i in range(1, len(gt)):
-                if serial[i][2]<=0 or serial[i][3]<=0:
-                    serial[i] = serial[i-1].copy()
-            res = np.array(serial_process(CLE, serial, gt))
-
-            for i in range(len(gt)):
-                if sum(gt[i]<=0):
-                    res[i]=-1
-
-            pr_cell = []
-            for i in self.thr:
-                pr_cell.append(np.sum(res<=i)/len(res))
-            pr.append(pr_cell)
-            
-        pr = np.array(pr)
-        pr_val = pr.mean(axis=0)[20]
-        return pr_val, pr
+    def __init__(self, thr=np.linspace(0, 50, 51), convention=None, backend=None) -> None:
+        super().__init__(convention, backend)
+        self.thr = thr
 
 
 class NPR(Metric):
     """
     Normalized Precision Rate.
     """
-    def __init__(self, thr=np.linspace(0, 0.5, 51)) -> None:
-        super().__init__()
-        self.thr = thr
-
-
-    def __call__(self, dataset:BaseRGBTDataet, result:TrackerResult, seqs:list):
-        pr=[]
-        for seq_name in seqs:
-            try:
-                gt = dataset[seq_name]
-                serial = result[seq_name]
-                serial[0] = gt[0]       # ignore the first frame
-            except:
-                gt = dataset[seq_name]['visible']
-                serial = result[seq_name]
-                serial[0] = gt[0]       # ignore the first frame
-            # cut off tracking result
-            serial = serial[:len(gt)]   
-            # handle the invailded tracking result
-            for i in range(1, len(gt)):
-                if serial[i][2]<=0 or serial[i][3]<=0:
-                    serial[i] = serial[i-1].copy()
-            res = np.array(serial_process(normalize_CLE, serial, gt))
-
-            for i in range(len(gt)):
-                if sum(gt[i]<=0):
-                    res[i]=-1
-
-            pr_cell = []
-            for i in self.thr:
-                pr_cell.append(np.sum(res<=i)/len(res))
-            pr.append(pr_cell)
-        pr = np.array(pr)
-        pr_val = pr.mean(axis=0)[20]
-        return pr_val, pr
+    kernel = staticmethod(batch_normalize_CLE)
+    op = '<='
+    variant = 'lasher'
+    value_index = 20
 
+    def __init__(self, thr=np.linspace(0, 0.5, 51), convention=None, backend=None) -> None:
+        super().__init__(convention, backend)
+        self.thr = thr
@@ -0,0 +1,139 @@
+"""
+Partial evaluations that merge exactly.
+
+A `MetricState` holds what a metric needs from some sequences of one tracker: the
+threshold counts and the frame number of every sequence (GTOT's frame totals are
+their sum). States of disjoint sequence shards merge in any order and grouping, the
+sequences are kept in the order of the dataset, so `finalize` runs `Metric.reduce` on
+the same arrays as a single-process run and returns the same numbers, bit for bit.
+
+    a = lasher.partial(lasher.PR, seqs=lasher.seqs_name[:100])['APFNet']
+    b = lasher.partial(lasher.PR, seqs=lasher.seqs_name[100:])['APFNet']
+    save_states('shard1.npz', [b])
+    a.merge(load_states('shard1.npz')[0]).finalize(lasher.PR_fun)    # == lasher.PR('APFNet')
+"""
+import json
+import numpy as np
+from .base import Metric, MetricResult
+
+
+class MetricState:
+    """
+    [in] metric - str
+        Class name of the metric, e.g. 'MPR_GTOT'.
+    [in] thr - ndarray
+        Its thresholds.
+    [in] seqs - list
+        The sequences, `index` is their position in the dataset.
+    [in] counts, frames - ndarray
+        Shape (len(seqs), len(thr)) and (len(seqs),), see `Metric.states`.
+    """
+    def __init__(self, metric:str, tracker:str, thr, seqs:list, index, counts, frames, backend:str='numpy') -> None:
+        self.metric = metric
+        self.tracker = tracker
+        self.thr = np.asarray(thr)
+        self.seqs = list(seqs)
+        self.index = np.asarray(index, dtype=np.int64)
+        self.counts = np.asarray(counts).reshape(len(self.seqs), len(self.thr))
+        self.frames = np.asarray(frames, dtype=np.int64)
+        self.backend = backend
+
+
+    @classmethod
+    def from_counts(cls, metric:Metric, dataset, tracker_name, counts, frames, seqs:list):
+        """
+        The state of the (counts, frames) of `Metric.states` on `seqs` of `dataset`.
+        """
+        position = {seq_name: i for i, seq_name in enumerate(dataset.seqs_name)}
+        return cls(type(metric).__name__, tracker_name, metric.thr, seqs, [position[seq_name] for seq_name in seqs],
+                   counts, frames, metric.backend_name()).sorted()
+
+
+    def sorted(self):
+        """
+        The same state with the sequences in the order of the dataset.
+        """
+        order = np.argsort(self.index, kind='stable')
+        return MetricState(self.metric, self.tracker, self.thr, [self.seqs[i] for i in order], self.index[order],
+                           self.counts[order], self.frames[order], self.backend)
+
+
+    def merge(self, other:'MetricState'):
+        """
+        The state of the sequences of both. A sequence in both must have the same counts.
+        """
+        if (self.metric, self.tracker)!=(other.metric, other.tracker) or not np.array_equal(self.thr, other.thr):
+            raise ValueError(f"Cannot merge {self} and {other}")
+        index = np.concatenate((self.index, other.index))
+        order = np.argsort(index, kind='stable')
+        index = index[order]
+        counts = np.concatenate((self.counts, other.counts))[order]
+        frames = np.concatenate((self.frames, other.frames))[order]
+        seqs = [(self.seqs+other.seqs)[i] for i in order]
+        dup = index[1:]==index[:-1]
+        bad = dup & ((counts[1:]!=counts[:-1]).any(axis=1) | (frames[1:]!=frames[:-1]))
+        if bad.any():
+            raise ValueError(f"{seqs[np.flatnonzero(bad)[0]]} has different counts in the merged states of {self.tracker}")
+        keep = np.concatenate(([True], ~dup)) if len(index) else np.zeros(0, dtype=bool)
+        backend = self.backend if self.backend==other.backend else 'mixed'
+        return MetricState(self.metric, self.tracker, self.thr, [seq_name for seq_name, k in zip(seqs, keep) if k], index[keep],
+                           counts[keep], frames[keep], backend)
+
+
+    def finalize(self, metric:Metric):
+        """
+        (value, curve) of the merged sequences, the same as calling the metric on them.
+        """
+        if type(metric).__name__!=self.metric or not np.array_equal(np.asarray(metric.thr), self.thr):
+            raise ValueError(f"{self} is not a state of {type(metric).__name__}")
+        return MetricResult(*metric.reduce(self.counts, self.frames), self.backend)
+
+
+    def to_dict(self):
+        return {'metric': self.metric, 'tracker': self.tracker, 'thr': self.thr, 'seqs': self.seqs, 'index': self.index,
+                'counts': self.counts, 'frames': self.frames, 'backend': self.backend}
+
+
+    @classmethod
+    def from_dict(cls, d:dict):
+        return cls(d['metric'], d['tracker'], d['thr'], d['seqs'], d['index'], d['counts'], d['frames'], d.get('backend', 'numpy'))
+
+
+    def __repr__(self) -> str:
+        return f"MetricState({self.metric}, {self.tracker}, {len(self.seqs)} seqs)"
+
+
+def merge_states(states:list):
+    """
+    Merge the states of the same (metric, tracker), {(metric, tracker): MetricState}.
+    """
+    merged = {}
+    for state in states:
+        key = (state.metric, state.tracker)
+        merged[key] = merged[key].merge(state) if key in merged else state
+    return merged
+
+
+def save_states(path:str, states:list):
+    """
+    Write states to one `.npz` file, the arrays as they are and the names in a JSON header.
+    """
+    header, arrays = [], {}
+    for i, state in enumerate(states):
+        d = state.to_dict()
+        header.append({'metric': d['metric'], 'tracker': d['tracker'], 'seqs': d['seqs'], 'backend': d['backend']})
+        for key in ('thr', 'index', 'counts', 'frames'):
+            arrays[f'{i}_{key}'] = d[key]
+    arrays['header'] = np.frombuffer(json.dumps(header).encode(), dtype=np.uint8)
+    with open(path, 'wb') as f:
+        np.savez(f, **arrays)
+
+
+def load_states(path:str):
+    """
+    The list of states of `save_states`.
+    """
+    with np.load(path, allow_pickle=False) as npz:
+        header = json.loads(npz['header'].tobytes().decode())
+        return [MetricState.from_dict({**h, **{key: npz[f'{i}_{key}'] for key in ('thr', 'index', 'counts', 'frames')}})
+                for i, h in enumerate(header)]
@@ -0,0 +1,183 @@
+"""
+Confidence intervals of the scores by resampling sequences.
+
+A metric value is a ratio of sums over the sequences (`Metric.seq_terms`), so a
+bootstrap draw only needs how many times each sequence was drawn: all draws are
+one (n_boot, n_seqs) weight matrix built from one index matrix, and the values of
+every draw and every tracker come from one matrix product.
+
+    rgbt234.bootstrap(rgbt234.MPR)     # {'APFNet': (0.827, 0.795, 0.856), ...}
+
+The paired tests work the same way: a random swap (or sign flip) of the two trackers
+per sequence is a row of a 0/1 matrix, and the statistics of all swaps and all tracker
+pairs come from one product with the per-sequence terms.
+
+    names, diff, p = rgbt234.significance(rgbt234.MPR)     # p[i, j]: is names[i] != names[j]
+"""
+import numpy as np
+
+
+def bootstrap_weights(n_seqs:int, n_boot:int=10000, seed=0):
+    """
+    (n_boot, n_seqs) number of times each sequence is drawn in each resample.
+    """
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, n_seqs, size=(n_boot, n_seqs))
+    idx += np.arange(n_boot)[:, None]*n_seqs
+    return np.bincount(idx.ravel(), minlength=n_boot*n_seqs).reshape(n_boot, n_seqs)
+
+
+def bootstrap_values(num, den, n_boot:int=10000, seed=0, weights=None):
+    """
+    Values of the resampled datasets.
+
+    [in] num, den - ndarray
+        Shape (len(seqs),) or (trackers, len(seqs)), see `Metric.seq_terms`.
+    [in] weights - ndarray
+        Reuse the draws of `bootstrap_weights`, e.g. to compare trackers on the same resamples.
+
+    Returns
+    -------
+    (n_boot,) or (n_boot, trackers) values.
+    """
+    num, den = np.asarray(num, dtype=np.float64), np.asarray(den, dtype=np.float64)
+    if weights is None:
+        weights = bootstrap_weights(num.shape[-1], n_boot, seed)
+    weights = weights.astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (weights @ num.T) / (weights @ den.T)
+
+
+def bootstrap_ci(num, den, n_boot:int=10000, alpha=0.05, seed=0):
+    """
+    Percentile interval (low, high) at level 1-alpha, of shape () or (trackers,).
+    """
+    values = bootstrap_values(num, den, n_boot, seed)
+    low, high = np.nanquantile(values, [alpha/2, 1-alpha/2], axis=0)
+    return low, high
+
+
+def metric_bootstrap(metric, states:dict, n_boot:int=10000, alpha=0.05, seed=0):
+    """
+    {tracker_name: (value, low, high)} from the {tracker_name: (counts, frames)} of
+    `Metric.evaluate_states`. All trackers are resampled with the same draws.
+    """
+    if not states:
+        return {}
+    names = list(states)
+    terms = [metric.seq_terms(*states[name]) for name in names]
+    low, high = bootstrap_ci(np.stack([num for num, _ in terms]), np.stack([den for _, den in terms]), n_boot, alpha, seed)
+    return {name: (metric.reduce(*states[name])[0], low[t], high[t]) for t, name in enumerate(names)}
+
+
+_ALTERNATIVES = ('two-sided', 'greater', 'less')
+
+
+def _flips(n_perm:int, n_seqs:int, seed, block:int):
+    # blocks of random 0/1 rows (1: swap the pair on that sequence), so memory stays (block, T, T)
+    rng = np.random.default_rng(seed)
+    done = 0
+    while done<n_perm:
+        size = min(block, n_perm-done)
+        yield rng.integers(0, 2, size=(size, n_seqs)).astype(np.float64)
+        done += size
+
+
+def _pvalues(observed, null_stats, alternative:str):
+    # observed (T, T), null_stats iterable of (block, T, T), p = (1+#as extreme)/(n+1)
+    if alternative not in _ALTERNATIVES:
+        raise ValueError(f"Unknown alternative: {alternative}, choose one of {_ALTERNATIVES}")
+    tol = 1e-12*np.maximum(1., np.abs(observed))
+    extreme = np.zeros(observed.shape, dtype=np.int64)
+    n = 0
+    for null in null_stats:
+        if alternative=='two-sided':
+            extreme += (np.abs(null)>=np.abs(observed)-tol).sum(axis=0)
+        elif alternative=='greater':
+            extreme += (null>=observed-tol).sum(axis=0)
+        else:
+            extreme += (null<=observed+tol).sum(axis=0)
+        n += len(null)
+    p = (extreme+1)/(n+1)
+    np.fill_diagonal(p, 1.)
+    return p
+
+
+def paired_permutation_test(num, den, n_perm:int=10000, seed=0, alternative='two-sided', block:int=1000):
+    """
+    Paired permutation test of every pair of trackers: the statistic is the difference of
+    the metric values, and under the null hypothesis the two trackers of a pair can be
+    swapped on each sequence.
+
+    [in] num, den - ndarray
+        Shape (trackers, len(seqs)), see `Metric.seq_terms`.
+    [in] alternative - str
+        'two-sided', or 'greater'/'less' for tracker i better/worse than tracker j.
+
+    Returns
+    -------
+    (diff, p), both (trackers, trackers): diff[i, j] = value[i]-value[j] and its p-value.
+    """
+    num, den = np.atleast_2d(np.asarray(num, dtype=np.float64)), np.atleast_2d(np.asarray(den, dtype=np.float64))
+    tot_num, tot_den = num.sum(axis=1), den.sum(axis=1)
+
+    def values(g_num, g_den):
+        # tracker i of pair (i, j) after the swaps: total - own swapped terms + the other's
+        a_num = tot_num[:, None] - g_num[..., :, None] + g_num[..., None, :]
+        a_den = tot_den[:, None] - g_den[..., :, None] + g_den[..., None, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            a = a_num/a_den
+        return a - np.swapaxes(a, -1, -2)
+
+    diff = values(np.zeros_like(tot_num), np.zeros_like(tot_den))
+    null = (values(flips @ num.T, flips @ den.T) for flips in _flips(n_perm, num.shape[1], seed, block))
+    return diff, _pvalues(diff, null, alternative)
+
+
+def sign_flip_test(scores, n_perm:int=10000, seed=0, alternative='two-sided', block:int=1000):
+    """
+    Sign-flip test of every pair of trackers on the per-sequence scores: the statistic is the
+    mean of the per-sequence differences, whose signs are random under the null hypothesis.
+
+    [in] scores - ndarray
+        Shape (trackers, len(seqs)).
+
+    Returns
+    -------
+    (diff, p) as `paired_permutation_test`.
+    """
+    scores = np.atleast_2d(np.asarray(scores, dtype=np.float64))
+    mean = scores.mean(axis=1)
+    diff = mean[:, None] - mean[None, :]
+    n_seqs = scores.shape[1]
+
+    def null():
+        for flips in _flips(n_perm, n_seqs, seed, block):
+            h = ((1.-2.*flips) @ scores.T)/n_seqs    # (block, trackers)
+            yield h[:, :, None] - h[:, None, :]
+    return diff, _pvalues(diff, null(), alternative)
+
+
+def metric_significance(metric, states:dict, test='permutation', n_perm:int=10000, seed=0, alternative='two-sided'):
+    """
+    Pairwise tests of the trackers from the {tracker_name: (counts, frames)} of `Metric.evaluate_states`.
+
+    [in] test - str
+        'permutation' (`paired_permutation_test` on the metric value) or 'sign_flip'
+        (`sign_flip_test` on the per-sequence scores num/den).
+
+    Returns
+    -------
+    (tracker_names, diff, p)
+    """
+    names = list(states)
+    terms = [metric.seq_terms(*states[name]) for name in names]
+    num, den = np.stack([num for num, _ in terms]), np.stack([den for _, den in terms])
+    if test=='permutation':
+        diff, p = paired_permutation_test(num, den, n_perm, seed, alternative)
+    elif test=='sign_flip':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            diff, p = sign_flip_test(num/den, n_perm, seed, alternative)
+    else:
+        raise ValueError(f"Unknown test: {test}, choose 'permutation' or 'sign_flip'.")
+    return names, diff, p
@@ -0,0 +1,183 @@
+"""
+Scores of a tracker while it runs.
+
+`StreamingEvaluator` is bound to a dataset and takes the result boxes frame by frame
+(`push`) or a sequence at a time (`push_sequence`). Every metric of the dataset keeps a
+histogram of threshold bins per sequence, with its thresholds sorted once, so a frame costs
+the scoring of one box, a binary search and one increment whatever the length of the
+sequences, and the counts of the thresholds are only summed up when the scores are asked
+for. Frames past the end of the ground truth are accepted and ignored, as in a result file. The boxes go through the same steps as
+in a batch evaluation (first box replaced by the ground truth, LasHeR boxes repeated over
+invalid ones, frames with an invalid LasHeR ground truth scoring -1), so once all frames
+are pushed the scores are the ones of `dataset.MPR(...)` etc.
+
+    stream = rgbt234.stream()
+    for i, box in enumerate(tracker.track(seq)):
+        stream.push(seq_name, i, box)
+    stream.scores()        # {'MPR': (value, curve), 'MSR': (value, curve)}
+"""
+import numpy as np
+from rgbt.dataset.basedataset import BaseRGBTDataet
+from rgbt.utils import bbox_array_trans, sorted_thresholds, sorted_bins, bin_counts
+from .base import MetricResult
+
+
+class StreamingEvaluator:
+    """
+    Running scores of one tracker on a dataset.
+
+    [in] metrics - str | list
+        Names of the dataset metrics (see `rgbt.metrics.compact.dataset_metrics`), default all.
+    [in] bbox_type - str
+        Type of the pushed boxes, rounded and converted to 'ltwh' as the result files are.
+    """
+    def __init__(self, dataset:BaseRGBTDataet, metrics=None, bbox_type='ltwh') -> None:
+        from .compact import dataset_metrics
+        self.dataset = dataset
+        self.metrics = dataset_metrics(dataset, metrics)
+        self.bbox_transfun = bbox_array_trans(bbox_type, 'ltwh', strict=dataset.convention.load_strict)
+        self._thr = {}      # {(metric name, dtype of the scores): (sorted thresholds, order)}
+        self.reset()
+
+
+    def reset(self, seq_name=None):
+        """
+        Forget the pushed frames of a sequence, or of all of them.
+        """
+        if seq_name==None:
+            self._frames = {}
+            self._last = {}
+            self._hist = {name: {} for name in self.metrics}
+            return
+        self._frames.pop(seq_name, None)
+        self._last.pop(seq_name, None)
+        for hist in self._hist.values():
+            hist.pop(seq_name, None)
+
+
+    def frames(self, seq_name):
+        """
+        Number of frames pushed for a sequence, the index of the next frame. Frames past
+        the end of the ground truth are counted but not scored.
+        """
+        return self._frames.get(seq_name, 0)
+
+
+    def push(self, seq_name, frame_idx:int, box):
+        """
+        Add the result box of frame `frame_idx` (0 is the first frame). The frames of a
+        sequence come in order, as the LasHeR metrics repeat the last valid box.
+        """
+        self.push_sequence(seq_name, np.asarray(box)[None], frame_idx)
+
+
+    def push_sequence(self, seq_name, boxes, start:int=None):
+        """
+        Add several consecutive boxes of a sequence, the whole result of a sequence by default.
+
+        [in] start - int
+            Frame of boxes[0], default the next frame of the sequence.
+        """
+        done = self.frames(seq_name)
+        if start!=None and start!=done:
+            raise ValueError(f"{seq_name}: frame {start} pushed, expected frame {done}")
+        gt = self.dataset[seq_name]
+        gt_v = gt['visible'] if isinstance(gt, dict) else gt
+        boxes = np.atleast_2d(np.asarray(boxes, dtype=np.float32))
+        # frames past the ground truth are consumed and ignored
+        self._frames[seq_name] = done+len(boxes)
+        # like a result file: float32 boxes rounded to integer pixels, converted and cut to the ground truth
+        boxes = self.bbox_transfun(boxes.round(0))[:max(0, len(gt_v)-done)]
+        if len(boxes)==0:
+            return
+        frames = slice(done, done+len(boxes))
+        first = boxes
+        if done==0:
+            first = boxes.copy()
+            first[0] = gt_v[0]      # ignore the first frame
+        filled = None
+        for name, metric in self.metrics.items():
+            kernel = metric.dataset_kernel(self.dataset)
+            if metric.variant=='raw':
+                values = kernel(boxes, gt['visible'][frames])
+                if metric.fusion=='min':
+                    values = np.minimum(values, kernel(boxes, gt['infrared'][frames]))
+                elif metric.fusion=='max':
+                    values = np.maximum(values, kernel(boxes, gt['infrared'][frames]))
+            elif metric.variant=='lasher':
+                if filled is None:
+                    filled = self._fill(seq_name, first, done)
+                values = kernel(filled, gt_v[frames])
+                values[self.dataset.gt_invalid(seq_name)[frames]] = -1
+            else:
+                values = kernel(first, gt_v[frames])
+            bins = sorted_bins(values, self._sorted_thr(name, values.dtype)[0], metric.op)
+            hist = self._hist[name].setdefault(seq_name, np.zeros(len(metric.thr)+1, dtype=np.int64))
+            if len(bins)==1:
+                hist[bins[0]] += 1
+            else:
+                hist += np.bincount(bins, minlength=len(hist))
+
+
+    def _sorted_thr(self, name, dtype):
+        key = (name, np.dtype(dtype))
+        if key not in self._thr:
+            self._thr[key] = sorted_thresholds(self.metrics[name].thr, dtype)
+        return self._thr[key]
+
+
+    def _fill(self, seq_name, boxes, done:int):
+        # `lasher_boxes` continued from the last box of the previous push
+        if done>0:
+            boxes = np.concatenate((self._last[seq_name][None], boxes))
+        invalid = (boxes[:, 2]<=0) | (boxes[:, 3]<=0)
+        invalid[0] = False
+        last = np.maximum.accumulate(np.where(invalid, 0, np.arange(len(boxes))))
+        filled = boxes[last]
+        self._last[seq_name] = filled[-1]
+        return filled[1:] if done>0 else filled
+
+
+    def state(self, name, seqs=None):
+        """
+        (counts, frames) of a metric as `Metric.states`, for the pushed sequences of `seqs`
+        (default all pushed sequences, in the order of the dataset).
+        """
+        metric = self.metrics[name]
+        if seqs==None:
+            seqs = [seq_name for seq_name in self.dataset.seqs_name if seq_name in self._frames]
+        else:
+            seqs = [seq_name for seq_name in seqs if seq_name in self._frames]
+        empty = np.zeros(len(metric.thr)+1, dtype=np.int64)
+        hist = np.array([self._hist[name].get(seq_name, empty) for seq_name in seqs], dtype=np.int64).reshape(len(seqs), len(metric.thr)+1)
+        # the thresholds of a metric are distinct, their order is the same in any float type
+        _, order = self._sorted_thr(name, np.float32)
+        counts = bin_counts(hist, order, metric.op)
+        return counts, np.array([min(self._frames[seq_name], self._length(seq_name)) for seq_name in seqs], dtype=np.int64)
+
+
+    def scores(self, seqs=None, complete=False):
+        """
+        {metric name: (value, curve)} of the pushed sequences.
+
+        [in] complete - bool
+            Only the sequences whose frames have all been pushed.
+        """
+        if complete:
+            seqs = [seq_name for seq_name in (self.dataset.seqs_name if seqs==None else seqs)
+                    if self.frames(seq_name)>=self._length(seq_name)]
+        res = {}
+        for name, metric in self.metrics.items():
+            counts, frames = self.state(name, seqs)
+            if len(frames):
+                res[name] = MetricResult(*metric.reduce(counts, frames), 'numpy')
+        return res
+
+
+    def _length(self, seq_name):
+        gt = self.dataset[seq_name]
+        return len(gt['visible'] if isinstance(gt, dict) else gt)
+
+
+    def __repr__(self) -> str:
+        return f"StreamingEvaluator({type(self.dataset).__name__}, {list(self.metrics)}, {len(self._frames)} seqs)"
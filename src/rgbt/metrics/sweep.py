@@ -0,0 +1,195 @@
+"""
+Score many result directories of one tracker, e.g. one per epoch or hyper-parameter setting.
+
+`sweep_checkpoints` loads and scores the checkpoints one at a time in a pool of processes
+(or in this process), never registers them on the dataset and drops their boxes and
+per-frame scores once the counts are computed, so memory does not grow with the number
+of checkpoints. Only the per-sequence threshold counts are kept (`MetricState`, in the
+smallest integer type), from which any value or curve is recomputed exactly. A ranked
+CSV is rewritten after every checkpoint, so the table can be watched while the sweep runs.
+
+    sweep = lasher.sweep('./ckpt/epoch_*', csv_path='sweep.csv', workers=8)
+    sweep.ranked()[:5]                          # best checkpoints by PR
+    value, curve = sweep.result('epoch_37', 'SR')
+"""
+import os
+import csv
+import copy
+import glob
+import warnings
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from rgbt.dataset.basedataset import BaseRGBTDataet, TrackerResult
+from .base import _worker, _init_worker
+from .backend import default_backend
+from .partial import MetricState
+
+
+def checkpoint_roots(roots):
+    """
+    {name: path} of a glob pattern or a list of paths (and patterns), named by their basename
+    or, when basenames repeat, by their path.
+    """
+    if isinstance(roots, str):
+        roots = [roots]
+    paths = []
+    for root in roots:
+        paths.extend(sorted(glob.glob(root)) if glob.has_magic(root) else [root])
+    names = [os.path.basename(os.path.normpath(path)) for path in paths]
+    if len(set(names))<len(names):
+        names = [os.path.normpath(path) for path in paths]
+    return dict(zip(names, paths))
+
+
+def score_checkpoint(dataset:BaseRGBTDataet, metrics:dict, name, path:str, prefix='', bbox_type='ltwh'):
+    """
+    {metric name: (counts, frames)} of one result directory on all sequences of the dataset.
+    """
+    result = TrackerResult(name, path, dataset.seqs_name, prefix, bbox_type, strict=dataset.convention.load_strict)
+    try:
+        return {metric_name: metric.states(dataset, result, dataset.seqs_name) for metric_name, metric in metrics.items()}
+    finally:
+        dataset.forget_scores(result)
+
+
+def _score_in_worker(metric_names:list, name, path:str, prefix, bbox_type):
+    from .compact import dataset_metrics
+    dataset = _worker['dataset']
+    metrics = {metric_name: fun for metric_name, fun in dataset_metrics(dataset).items() if metric_name in metric_names}
+    return score_checkpoint(dataset, metrics, name, path, prefix, bbox_type)
+
+
+class Sweep:
+    """
+    Scores of the checkpoints of a sweep.
+
+    `values` is {name: {metric name: value}}, `states` {name: {metric name: MetricState}}
+    (empty with `keep_states=False`), `paths` {name: path} and `errors` {name: message} of the
+    checkpoints that could not be scored.
+    """
+    def __init__(self, dataset:BaseRGBTDataet, metrics:dict) -> None:
+        self.dataset = dataset
+        self.metrics = metrics
+        self.values = {}
+        self.states = {}
+        self.paths = {}
+        self.errors = {}
+
+
+    def add(self, name, path:str, states:dict, keep_states=True):
+        self.paths[name] = path
+        self.values[name] = {}
+        kept = {}
+        for metric_name, (counts, frames) in states.items():
+            metric = self.metrics[metric_name]
+            state = MetricState.from_counts(metric, self.dataset, name, counts, frames, self.dataset.seqs_name)
+            self.values[name][metric_name] = float(state.finalize(metric)[0])
+            if keep_states:
+                # the counts fit the type of the largest frame number, the values do not change
+                state.counts = state.counts.astype(np.min_scalar_type(max(int(frames.max(initial=0)), 1)))
+                kept[metric_name] = state
+        if keep_states:
+            self.states[name] = kept
+
+
+    def ranked(self, metric_name=None):
+        """
+        Names of the checkpoints, best first by `metric_name` (default the first metric).
+        """
+        metric_name = metric_name or next(iter(self.metrics))
+        return sorted(self.values, key=lambda name: self.values[name][metric_name], reverse=True)
+
+
+    def result(self, name, metric_name):
+        """
+        (value, curve) of one checkpoint, as calling the metric of the dataset on it.
+        """
+        return self.states[name][metric_name].finalize(self.metrics[metric_name])
+
+
+    def write_csv(self, path:str, metric_name=None):
+        """
+        The ranked table: rank, name, one column per metric, path. Replaced atomically.
+        """
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['rank', 'name'] + list(self.metrics) + ['path'])
+            for rank, name in enumerate(self.ranked(metric_name), 1):
+                writer.writerow([rank, name] + [repr(self.values[name][m]) for m in self.metrics] + [self.paths[name]])
+        os.replace(tmp, path)
+
+
+    def __len__(self):
+        return len(self.values)
+
+
+    def __repr__(self) -> str:
+        return f"Sweep({len(self.values)} checkpoints, {len(self.errors)} errors, metrics={list(self.metrics)})"
+
+
+def sweep_checkpoints(dataset:BaseRGBTDataet, roots, metrics=None, prefix='', bbox_type='ltwh', csv_path=None,
+                      workers=None, keep_states=True, rank_by=None):
+    """
+    Score every checkpoint of `roots`, see `rgbt.metrics.sweep`.
+
+    [in] roots - str | list
+        A glob pattern or a list of result roots, see `checkpoint_roots`.
+    [in] metrics - str | list
+        Names of the dataset metrics, default all.
+    [in] csv_path - str
+        Rewrite the ranked table there after every checkpoint.
+    [in] workers - int
+        Score the checkpoints in a pool of processes, at most 2*workers are queued at a time.
+    [in] keep_states - bool
+        Keep the per-sequence counts of every checkpoint for `Sweep.result`, or only the values.
+    [in] rank_by - str
+        Metric of the ranking, default the first one.
+    """
+    from .compact import dataset_metrics
+    funs = dataset_metrics(dataset, metrics)
+    sweep = Sweep(dataset, funs)
+    todo = list(checkpoint_roots(roots).items())
+
+    def done(name, path, states=None, error=None):
+        if error!=None:
+            sweep.errors[name] = f'{path}: {error}'
+            warnings.warn(f"checkpoint {name} skipped: {error}")
+            return
+        sweep.add(name, path, states, keep_states)
+        if csv_path!=None:
+            sweep.write_csv(csv_path, rank_by)
+
+    if workers==None or workers<=1:
+        for name, path in todo:
+            try:
+                states = score_checkpoint(dataset, funs, name, path, prefix, bbox_type)
+            except Exception as err:
+                done(name, path, error=err)
+                continue
+            done(name, path, states)
+        return sweep
+
+    # the workers get the ground truth once, without the registered trackers
+    light = copy.copy(dataset)
+    light.trackers = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(light, {}, default_backend())) as pool:
+        pending = {}
+        queue = iter(todo)
+        while True:
+            for name, path in queue:
+                pending[pool.submit(_score_in_worker, list(funs), name, path, prefix, bbox_type)] = (name, path)
+                if len(pending)>=2*workers:
+                    break
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, path = pending.pop(future)
+                try:
+                    states = future.result()
+                except Exception as err:
+                    done(name, path, error=err)
+                    continue
+                done(name, path, states)
+    return sweep
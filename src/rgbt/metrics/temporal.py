@@ -0,0 +1,194 @@
+"""
+Where in a sequence a tracker fails.
+
+The per-frame values of a metric (`Metric.frame_values`, e.g. the fused IoU of MSR or the
+center error of PR) are compared with one threshold: a frame is tracked when it passes
+it, lost otherwise. The values of all trackers and sequences are concatenated into one
+flat array with offsets, and the analysis runs once on it:
+
+- the trailing sliding-window rate of tracked frames (success or precision over time),
+- the lost runs by a run-length encoding that stops at the sequence boundaries,
+- failure events, the lost runs of at least `k` frames, their recovery latency (the length
+  of the run, -1 when the tracker never recovers) and the longest lost run per sequence.
+
+Frames whose value is NaN or that the metric scores -1 (LasHeR frames with an invalid
+ground truth) are lost, as they fail every threshold of the metric.
+
+    tl = lasher.temporal(lasher.SR, thr=0.5, window=30, k=10)['APFNet']
+    tl.summary()                            # {'failures': 412, 'recovered': 380, ...}
+    tl.seq('leftdrillmanstand')['rate']     # sliding success rate of one sequence
+"""
+import numpy as np
+from rgbt.utils import threshold_dtype
+
+
+def tracked_frames(values, thr, op='<='):
+    """
+    `values <op> thr` compared in the type of `threshold_counts`, NaN is never tracked.
+    """
+    values = np.asarray(values)
+    dtype = threshold_dtype(values, [thr])
+    values, thr = values.astype(dtype, copy=False), dtype.type(thr)
+    if op=='<=':
+        return values<=thr
+    if op=='<':
+        return values<thr
+    if op=='>':
+        return values>thr
+    raise ValueError(f"Unknown comparison: {op}")
+
+
+def sliding_rate(mask, offsets, window:int):
+    """
+    Rate of True over the trailing `window` frames of every frame (fewer at the start of
+    a sequence), float32 of the shape of the flat `mask`.
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    csum = np.zeros(len(mask)+1, dtype=np.int64)
+    np.cumsum(mask, out=csum[1:])
+    pos = np.arange(len(mask))
+    start = np.repeat(offsets[:-1], np.diff(offsets))
+    low = np.maximum(start, pos-window+1)
+    return ((csum[pos+1]-csum[low])/(pos+1-low)).astype(np.float32)
+
+
+def run_lengths(mask, offsets):
+    """
+    The runs of True in a flat mask, not crossing the sequence boundaries.
+
+    Returns
+    -------
+    (segment, start, length) int arrays, one entry per run in the order of the runs:
+    `segment` indexes the sequences of `offsets`, `start` is the frame in the sequence.
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    mask = np.asarray(mask, dtype=bool)
+    first = np.zeros(len(mask), dtype=bool)
+    last = np.zeros(len(mask), dtype=bool)
+    first[offsets[:-1][np.diff(offsets)>0]] = True
+    last[offsets[1:][np.diff(offsets)>0]-1] = True
+    prev = np.concatenate(([False], mask[:-1])) & ~first
+    nxt = np.concatenate((mask[1:], [False])) & ~last
+    starts = np.flatnonzero(mask & ~prev)
+    ends = np.flatnonzero(mask & ~nxt)
+    segment = np.searchsorted(offsets, starts, side='right')-1
+    return segment, starts-offsets[segment], ends-starts+1
+
+
+class Timeline:
+    """
+    Temporal analysis of one tracker, see `rgbt.metrics.temporal`.
+
+    Per frame (flat, sequence i is [offsets[i]:offsets[i+1]]): `values`, `tracked`, `rate`.
+    Per failure event: `event_seq` (index in `seqs`), `event_start` (frame), `event_length`
+    and `event_recovered`. Per sequence: `longest_lost`.
+    """
+    def __init__(self, seqs:list, offsets, values, tracked, rate, event_seq, event_start, event_length, event_recovered, longest_lost) -> None:
+        self.seqs = list(seqs)
+        self.offsets = offsets
+        self.values = values
+        self.tracked = tracked
+        self.rate = rate
+        self.event_seq = event_seq
+        self.event_start = event_start
+        self.event_length = event_length
+        self.event_recovered = event_recovered
+        self.longest_lost = longest_lost
+
+
+    @property
+    def recovery_latency(self):
+        """
+        Frames from the start of every failure until the target is tracked again, -1 when it is not.
+        """
+        return np.where(self.event_recovered, self.event_length, -1)
+
+
+    def failures(self):
+        """
+        Number of failure events per sequence.
+        """
+        return np.bincount(self.event_seq, minlength=len(self.seqs))
+
+
+    def seq(self, seq_name):
+        """
+        The arrays of one sequence as a dict.
+        """
+        i = self.seqs.index(seq_name)
+        a, b = self.offsets[i], self.offsets[i+1]
+        ev = self.event_seq==i
+        return {'values': self.values[a:b], 'tracked': self.tracked[a:b], 'rate': self.rate[a:b],
+                'event_start': self.event_start[ev], 'event_length': self.event_length[ev],
+                'recovery_latency': self.recovery_latency[ev], 'longest_lost': int(self.longest_lost[i])}
+
+
+    def summary(self):
+        """
+        Totals over the sequences.
+        """
+        latency = self.event_length[self.event_recovered]
+        return {'frames': len(self.values),
+                'tracked': float(self.tracked.mean()) if len(self.tracked) else np.nan,
+                'failures': len(self.event_seq),
+                'recovered': int(self.event_recovered.sum()),
+                'mean_latency': float(latency.mean()) if len(latency) else np.nan,
+                'longest_lost': int(self.longest_lost.max(initial=0))}
+
+
+    def __repr__(self) -> str:
+        return f"Timeline({len(self.seqs)} seqs, {len(self.values)} frames, {len(self.event_seq)} failures)"
+
+
+def temporal_analysis(metric, dataset, results:dict, seqs:list, thr=None, window:int=30, k:int=10):
+    """
+    {tracker_name: Timeline} of several trackers.
+
+    [in] metric - Metric
+        Gives the per-frame values and the comparison, e.g. `dataset.SR_fun`.
+    [in] thr - float
+        A frame is tracked when `value <metric.op> thr`, default the threshold of the value the
+        metric reports (`Metric.value_thr`), e.g. 20 pixels for PR, 5 for GTOT's MPR, 0.5 for SR.
+    [in] window - int
+        Length of the sliding window in frames.
+    [in] k - int
+        A failure is a run of at least k lost frames.
+    """
+    if thr==None:
+        thr = metric.value_thr()
+        if thr==None:
+            raise ValueError(f"{type(metric).__name__} has no default threshold, give thr")
+    seqs = list(seqs)
+    names = list(results)
+    if not names:
+        return {}
+    values = []
+    for seq_name in seqs:
+        metric.batch_scores(dataset, [results[name] for name in names], seq_name)
+    for name in names:
+        values.extend(metric.frame_values(dataset, results[name], seq_name) for seq_name in seqs)
+
+    # one flat array of every (tracker, sequence)
+    offsets = np.zeros(len(values)+1, dtype=np.int64)
+    np.cumsum([len(v) for v in values], out=offsets[1:])
+    flat = np.concatenate(values) if values else np.zeros(0)
+    tracked = tracked_frames(flat, thr, metric.op)
+    rate = sliding_rate(tracked, offsets, window)
+    segment, start, length = run_lengths(~tracked, offsets)
+    longest = np.zeros(len(values), dtype=np.int32)
+    np.maximum.at(longest, segment, length.astype(np.int32))
+    failure = length>=k
+    segment, start, length = segment[failure], start[failure], length[failure]
+    recovered = start+length<np.diff(offsets)[segment]
+
+    timelines = {}
+    n = len(seqs)
+    bounds = np.searchsorted(segment, np.arange(len(names)+1)*n)
+    for t, name in enumerate(names):
+        a, b = offsets[t*n], offsets[(t+1)*n]
+        ev = slice(bounds[t], bounds[t+1])
+        timelines[name] = Timeline(seqs, (offsets[t*n:(t+1)*n+1]-a).astype(np.int32),
+                                   flat[a:b].astype(np.float32), tracked[a:b], rate[a:b],
+                                   (segment[ev]-t*n).astype(np.int32), start[ev].astype(np.int32),
+                                   length[ev].astype(np.int32), recovered[ev], longest[t*n:(t+1)*n])
+    return timelines
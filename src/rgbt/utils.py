@@ -1,6 +1,7 @@
 # Do not edit this file.
 
 import numpy as np
+from functools import partial
 from typing import Any, Union
 global _strict
 _strict = True
@@ -16,6 +17,9 @@ def RGBT_start():
     width and height when converting the bounding box type, such as GTOT.
     This leads to inconsistent bbox conversion between different datasets, so when 
     testing GTOT, you need to call this function first to correct this error.
+
+    The datasets and their metrics now carry their own `BoxConvention` (GTOT is loose),
+    this only sets the default of the per-box functions (`CLE`, `IoU`, `ltrb_2_ltwh`, ...).
     """
     global _strict
     _strict = False
@@ -28,10 +32,142 @@ def RGBT_end():
     _strict = True
 
 
+def is_strict():
+    """
+    The default pixel convention of the per-box functions, see `RGBT_start`.
+    """
+    return _strict
+
+
+def set_strict(strict:bool):
+    """
+    Set the default pixel convention of the per-box functions. `RGBT_start()` is `set_strict(False)`.
+    """
+    global _strict
+    _strict = bool(strict)
+
+
+class BoxConvention:
+    """
+    Pixel convention of a dataset, fixed when the dataset and its metrics are built.
+    A strict box covers the pixels l..l+w-1 (w = r-l+1 and the center is l+(w-1)/2),
+    a loose box l..l+w (w = r-l and the center is l+w/2).
+
+    [in] load_strict - bool
+        Convention of the ground truth and result conversions to 'ltwh'.
+    [in] eval_strict - bool
+        Convention of the box centers in the metrics, default the same as `load_strict`.
+    """
+    def __init__(self, load_strict:bool, eval_strict:bool=None) -> None:
+        self.load_strict = bool(load_strict)
+        self.eval_strict = self.load_strict if eval_strict==None else bool(eval_strict)
+
+    def __eq__(self, other):
+        return isinstance(other, BoxConvention) and (self.load_strict, self.eval_strict)==(other.load_strict, other.eval_strict)
+
+    def __hash__(self):
+        return hash((self.load_strict, self.eval_strict))
+
+    def __repr__(self) -> str:
+        return f"BoxConvention(load_strict={self.load_strict}, eval_strict={self.eval_strict})"
+
+
+STRICT = BoxConvention(True)
+LOOSE = BoxConvention(False)
+# RGBT234 and RGBT210: results converted like the GTOT toolkit, metrics computed strictly
+LOOSE_LOAD = BoxConvention(False, True)
+
+
+def global_convention():
+    """
+    The convention set by `RGBT_start`/`RGBT_end`, for code that does not give one.
+    """
+    return STRICT if _strict else LOOSE
+
+
 def load_text(path:str, dtype:Any=np.float32):
+    if np.issubdtype(np.dtype(dtype), np.number):
+        return load_boxes(path, dtype=dtype)
     return load_text_numpy(path, delimiter=[',', ' ', '\t'], dtype=dtype)
 
 
+class BoxFileError(ValueError):
+    """
+    A malformed row in a box file.
+    """
+    def __init__(self, path:str, lineno:int, line:str, reason:str) -> None:
+        self.path = path
+        self.lineno = lineno
+        self.line = line
+        self.reason = reason
+        super().__init__(f'{path}, line {lineno}: {reason}: {line!r}')
+
+    def __reduce__(self):
+        return BoxFileError, (self.path, self.lineno, self.line, self.reason)
+
+
+def load_boxes(path:str, dtype:Any=np.float32):
+    """
+    Read a box file (ground truth or tracking result) in one pass, see `parse_boxes`.
+    """
+    with open(path) as f:
+        lines = f.read().splitlines()
+    return parse_boxes(lines, path, dtype=dtype)
+
+
+def parse_boxes(lines:list, path:str='<text>', dtype:Any=np.float32):
+    """
+    Parse the lines of a box file.
+    The delimiter is sniffed from the first row: ',' if it has one, else any whitespace.
+    Mixed whitespace and trailing delimiters are accepted. A malformed row raises
+    `BoxFileError` with the file and line number.
+    Like `np.loadtxt`, a single row or column is squeezed.
+    """
+    first = None
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if line:
+            first = line
+            break
+    if first==None:
+        return np.loadtxt(lines, dtype=dtype)
+
+    delimiter = ',' if ',' in first else None
+    ncols = len(_split_box_row(first, delimiter))
+    try:
+        # fast path, one call to the C parser, which raises when the number of columns changes
+        fast = lines
+        if delimiter==',' and first.endswith(','):
+            fast = [line.rstrip(', \t') for line in lines]
+        return np.loadtxt(fast, delimiter=delimiter, dtype=dtype)
+    except ValueError:
+        pass
+
+    rows = []
+    for lineno, line in enumerate(lines, 1):
+        row = line.split('#', 1)[0].strip()
+        if not row:
+            continue
+        fields = _split_box_row(row, delimiter)
+        if len(fields)!=ncols:
+            raise BoxFileError(path, lineno, line, f'expect {ncols} values, got {len(fields)}')
+        try:
+            rows.append([float(x) for x in fields])
+        except ValueError:
+            raise BoxFileError(path, lineno, line, 'not a number') from None
+    return np.array(rows, dtype=np.float64).astype(dtype).squeeze()
+
+
+def _split_box_row(row:str, delimiter):
+    if delimiter==None:
+        return row.split()
+    fields = [x.strip() for x in row.rstrip(delimiter+' \t').split(delimiter)]
+    if '' in fields:
+        # keep the empty field, it is reported as not a number
+        return fields
+    return [y for x in fields for y in x.split()]
+
+
 def load_text_numpy(path:str, delimiter:Union[str, list[str]]=' ', dtype=np.float32):
     if isinstance(delimiter, (tuple, list)):
         for d in delimiter:
@@ -51,8 +187,8 @@ def ltwh_2_ltrb(rect):
     return [rect[0], rect[1], rect[2]+rect[0]-1, rect[3]+rect[1]-1]
 
 
-def ltrb_2_ltwh(rect):
-    if _strict:
+def ltrb_2_ltwh(rect, strict=None):
+    if (_strict if strict==None else strict):
         return [rect[0], rect[1], rect[2]-rect[0]+1, rect[3]-rect[1]+1]
     else:
         return [rect[0], rect[1], rect[2]-rect[0], rect[3]-rect[1]]
@@ -80,21 +216,46 @@ def corner_2_ltrb(rect):
     return [rect[0], rect[1], rect[-2-2], rect[-1-2]]
 
 
-def corner_2_ltwh(rect):
-    if _strict:
+def corner_2_ltwh(rect, strict=None):
+    if (_strict if strict==None else strict):
         return [rect[0], rect[1], rect[2]-rect[0]+1, rect[5]-rect[1]+1]
     else:
         return [rect[0], rect[1], rect[2]-rect[0], rect[5]-rect[1]]
 
 
-def bbox_type_trans(bbox_type_src, bbox_type_new):
+def bbox_type_trans(bbox_type_src, bbox_type_new, strict=None):
+    """
+    Return the bbox conversion function. Give `strict` to bind the pixel
+    convention now instead of reading it when the function is called.
+    """
     if bbox_type_src!=bbox_type_new:
-        return eval(bbox_type_src+'_2_'+bbox_type_new)
+        fun = eval(bbox_type_src+'_2_'+bbox_type_new)
+        if strict!=None and fun in (ltrb_2_ltwh, corner_2_ltwh):
+            return partial(fun, strict=strict)
+        return fun
     else:
         return lambda x:x
     
 
 
+def _trans_boxes(fun, boxes):
+    boxes = np.atleast_2d(boxes)
+    if fun==None:
+        return boxes
+    return np.stack(fun(boxes.T), axis=1)
+
+
+def bbox_array_trans(bbox_type_src, bbox_type_new, strict=None):
+    """
+    Array version of `bbox_type_trans`, converts a (N, k) array of boxes in one call.
+    The same formulas are applied to whole columns, so the values match the per-box
+    conversion exactly. The array is returned as it is when no conversion is needed.
+    """
+    if bbox_type_src==bbox_type_new:
+        return partial(_trans_boxes, None)
+    return partial(_trans_boxes, bbox_type_trans(bbox_type_src, bbox_type_new, strict=strict))
+
+
 def serial_process(fun, *serial):
     return list(map(fun, *serial))
 
@@ -119,6 +280,12 @@ def normalize(cx, cy, gt_w, gt_h, eps=1e-8):
     return cx/(gt_w+eps), cy/(gt_h+eps)
 
 
+def _distance(dx, dy):
+    # multiply and sqrt are correctly rounded; the per-box `CLE` uses `**0.5`, which goes
+    # through the platform pow on numpy scalars and may differ in the last bit
+    return np.sqrt(dx*dx + dy*dy)
+
+
 def CLE(rect1, rect2):
     """ caculate center location error
     NOTE: Default rect2 is groundtruth
@@ -183,4 +350,175 @@ def IoU(rect1, rect2):
     target_a = rect2[-1]*rect2[-2]
     inter = ww * hh
     iou = inter / (area + target_a - inter)
-    return iou
\ No newline at end of file
+    return iou
+
+def _batch_pair(rect1, rect2):
+    # like `map`, stop at the shorter serial; leading axes (e.g. trackers) broadcast
+    rect1 = np.atleast_2d(np.asarray(rect1))
+    rect2 = np.atleast_2d(np.asarray(rect2))
+    n = min(rect1.shape[-2], rect2.shape[-2])
+    return rect1[..., :n, :], rect2[..., :n, :]
+
+
+def _batch_center(rect, strict):
+    if strict:
+        return (rect[..., 2]-1)/2.+rect[..., 0], (rect[..., 3]-1)/2.+rect[..., 1]
+    else:
+        return rect[..., 2]/2.+rect[..., 0], rect[..., 3]/2.+rect[..., 1]
+
+
+def batch_CLE(rect1, rect2, strict=None):
+    """ center location error of every frame
+    Same as `np.array(serial_process(CLE, rect1, rect2))` to within 2 ulp: the square root
+    is correctly rounded here, the per-box `**0.5` may be off by one in the last bit.
+    Args:
+        rect1: (N, 4) array of (l, t, w, h), or (T, N, 4) for T trackers
+        rect2: (N, 4) array of (l, t, w, h), groundtruth
+        strict: pixel convention, default reads `_strict`
+    Returns:
+        (N,) center location errors, or (T, N)
+    """
+    rect1, rect2 = _batch_pair(rect1, rect2)
+    strict = _strict if strict==None else strict
+    cx1, cy1 = _batch_center(rect1, strict)
+    cx2, cy2 = _batch_center(rect2, strict)
+    return _distance(cx1-cx2, cy1-cy2)
+
+
+def batch_normalize_CLE(rect1, rect2, strict=None):
+    """ normalized center location error of every frame
+    Same as `np.array(serial_process(normalize_CLE, rect1, rect2))` to within 2 ulp, see `batch_CLE`.
+    """
+    rect1, rect2 = _batch_pair(rect1, rect2)
+    strict = _strict if strict==None else strict
+    cx1, cy1 = _batch_center(rect1, strict)
+    cx2, cy2 = _batch_center(rect2, strict)
+    cx1, cy1 = normalize(cx1, cy1, rect2[..., 2], rect2[..., 3])
+    cx2, cy2 = normalize(cx2, cy2, rect2[..., 2], rect2[..., 3])
+    return _distance(cx1-cx2, cy1-cy2)
+
+
+def batch_IoU(rect1, rect2, strict=None):
+    """ interection over union of every frame
+    Same as `np.array(serial_process(IoU, rect1, rect2))`, value for value.
+    Args:
+        rect1: (N, 4) array of (l, t, w, h), or (T, N, 4) for T trackers
+        rect2: (N, 4) array of (l, t, w, h)
+        strict: not used, the overlap does not depend on the pixel convention
+    Returns:
+        (N,) iou, or (T, N)
+    """
+    rect1, rect2 = _batch_pair(rect1, rect2)
+    x1, y1, x2, y2 = ltwh_2_ltrb(np.moveaxis(rect1, -1, 0))
+    tx1, ty1, tx2, ty2 = ltwh_2_ltrb(np.moveaxis(rect2, -1, 0))
+
+    xx1 = np.maximum(tx1, x1)
+    yy1 = np.maximum(ty1, y1)
+    xx2 = np.minimum(tx2, x2)
+    yy2 = np.minimum(ty2, y2)
+
+    ww = np.maximum(0, xx2 - xx1 +1)
+    hh = np.maximum(0, yy2 - yy1 +1)
+
+    area = rect1[..., -1]*rect1[..., -2]
+    target_a = rect2[..., -1]*rect2[..., -2]
+    inter = ww * hh
+    with np.errstate(divide='ignore', invalid='ignore'):
+        iou = inter / (area + target_a - inter)
+    return iou
+
+
+def threshold_dtype(values, thr):
+    """
+    The type `values<=t` compares in, python floats follow the values.
+    """
+    if isinstance(thr, np.ndarray):
+        return np.result_type(values, thr)
+    return np.result_type(values, *thr) if len(thr) else np.asarray(values).dtype
+
+
+def sorted_thresholds(thr, dtype):
+    """
+    (sorted thresholds, order) for `sorted_bins`, in the type the values of type `dtype` compare in.
+    """
+    dtype = threshold_dtype(np.zeros(0, dtype=dtype), thr)
+    thr = np.asarray(thr, dtype=dtype)
+    order = np.argsort(thr, kind='stable')
+    return thr[order], order
+
+
+def sorted_bins(values, thr_sorted, op='<='):
+    """
+    Histogram bin of every value against thresholds sorted by `sorted_thresholds`.
+    """
+    values = np.asarray(values).reshape(-1).astype(thr_sorted.dtype, copy=False)
+    n_thr = len(thr_sorted)
+
+    if op=='<=':
+        # values[k] <= thr_sorted[j] for every j >= bins[k]
+        bins = np.searchsorted(thr_sorted, values, side='left')
+        bins[np.isnan(values)] = n_thr
+    elif op=='<':
+        bins = np.searchsorted(thr_sorted, values, side='right')
+        bins[np.isnan(values)] = n_thr
+    elif op=='>':
+        # values[k] > thr_sorted[j] for every j < bins[k]
+        bins = np.searchsorted(thr_sorted, values, side='left')
+        bins[np.isnan(values)] = 0
+    else:
+        raise ValueError(f"Unknown comparison: {op}")
+    return bins
+
+
+def threshold_bins(values, thr, op='<='):
+    """
+    Histogram bin of every value for `threshold_counts`, a bin says which thresholds the value
+    passes. Returns (bins, order) with `order` sorting `thr`, see `bin_counts`.
+    """
+    values = np.asarray(values)
+    thr_sorted, order = sorted_thresholds(thr, values.dtype)
+    return sorted_bins(values, thr_sorted, op), order
+
+
+def bin_counts(hist, order, op='<='):
+    """
+    Counts per threshold from histograms of `threshold_bins`, shape (..., len(thr)+1) to (..., len(thr)).
+    """
+    hist = np.asarray(hist)
+    n_thr = len(order)
+    cum = np.cumsum(hist, axis=-1)[..., :n_thr]
+    if op=='>':
+        cum = hist.sum(axis=-1, keepdims=True) - cum
+
+    counts = np.empty_like(cum)
+    counts[..., order] = cum
+    return counts
+
+
+def threshold_counts(values, thr, op='<=', offsets=None):
+    """
+    Number of values passing every threshold, the same as
+    `[np.sum(op(values, t)) for t in thr]` with `op` one of '<=', '<' and '>'.
+    NaN never passes. One sort of the thresholds and one histogram of the values,
+    so the cost hardly depends on the number of thresholds.
+
+    [in] values - ndarray
+        Per-frame scores, e.g. the center location errors.
+    [in] thr - array like
+        The thresholds, in any order.
+    [in] offsets - ndarray
+        Give the offsets of several sequences concatenated in `values`
+        (sequence i is values[offsets[i]:offsets[i+1]]) to count them all at once.
+
+    Returns
+    -------
+    (len(thr),) counts, or (len(offsets)-1, len(thr)) with `offsets`.
+    """
+    bins, order = threshold_bins(values, thr, op)
+    n_thr = len(order)
+    if offsets is None:
+        return bin_counts(np.bincount(bins, minlength=n_thr+1), order, op)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    seq_id = np.repeat(np.arange(len(offsets)-1), np.diff(offsets))
+    hist = np.bincount(seq_id*(n_thr+1)+bins, minlength=(len(offsets)-1)*(n_thr+1)).reshape(-1, n_thr+1)
+    return bin_counts(hist, order, op)
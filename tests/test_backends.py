@@ -0,0 +1,68 @@
+"""
+The 'numba' backend gives the counts of the 'numpy' backend, skipped without numba.
+"""
+import warnings
+import numpy as np
+import pytest
+from rgbt import RGBT234, RGBT210, GTOT, LasHeR
+from rgbt.utils import STRICT, LOOSE
+from rgbt.metrics.backend import set_backend, default_backend
+from rgbt.metrics.compact import dataset_metrics
+
+pytest.importorskip('numba')
+
+
+def random_result(dataset, seqs, rng, dtype=None):
+    """
+    Noisy ground truth with lost targets, NaN boxes and results shorter than the ground truth.
+    With `dtype`, fractional boxes of that type.
+    """
+    preloaded = {}
+    for seq_name in seqs:
+        gt = dataset[seq_name]
+        gt = gt['visible'] if isinstance(gt, dict) else gt
+        if dtype==None:
+            boxes = gt + rng.normal(0, 8, gt.shape).round().astype(gt.dtype)
+        else:
+            boxes = gt.astype(dtype) + rng.normal(0, 8, gt.shape).astype(dtype)
+        boxes[rng.random(len(boxes))<0.05, 2:] = rng.integers(-3, 1, 2)
+        boxes[rng.random(len(boxes))<0.01, 3] = np.nan
+        preloaded[seq_name] = boxes[:len(boxes)-int(rng.integers(0, 3))]
+    return preloaded
+
+
+@pytest.mark.parametrize('dtype', [None, np.float64], ids=['gt-type', 'float64'])
+@pytest.mark.parametrize('convention', [STRICT, LOOSE], ids=['strict', 'loose'])
+@pytest.mark.parametrize('Dataset', [RGBT234, RGBT210, GTOT, LasHeR])
+def test_numba_counts_match_numpy(Dataset, convention, dtype):
+    rng = np.random.default_rng(0)
+    dataset = Dataset(convention=convention)
+    seqs = list(dataset.seqs_name[:40])
+    result = dataset('random', '.', seqs=seqs, bbox_type='ltwh', preloaded=random_result(dataset, seqs, rng, dtype))
+    if dtype!=None:
+        gt = dataset[seqs[0]]
+        assert result[seqs[0]].dtype==dtype and (gt['visible'] if isinstance(gt, dict) else gt).dtype==np.float32
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        for metric_name, metric in dataset_metrics(dataset).items():
+            for seq_name in seqs:
+                metric.backend = 'numpy'
+                counts, frames = metric.seq_state(dataset, result, seq_name)
+                metric.backend = 'numba'
+                counts_jit, frames_jit = metric.seq_state(dataset, result, seq_name)
+                assert np.array_equal(counts, counts_jit), (metric_name, seq_name)
+                assert frames==frames_jit
+            metric.backend = None
+
+
+def test_numpy_is_the_default():
+    assert default_backend()=='numpy'
+    dataset = GTOT()
+    seqs = list(dataset.seqs_name[:3])
+    dataset('random', '.', seqs=seqs, bbox_type='ltwh', preloaded=random_result(dataset, seqs, np.random.default_rng(1)))
+    assert dataset.MPR('random', seqs=seqs).backend=='numpy'
+    set_backend('auto')
+    try:
+        assert dataset.MPR('random', seqs=seqs).backend=='numba'
+    finally:
+        set_backend('numpy')
@@ -0,0 +1,126 @@
+"""
+The array kernels give the values of the per-frame functions.
+"""
+import warnings
+import numpy as np
+import pytest
+import rgbt.utils as utils
+from rgbt.metrics.base import lasher_boxes
+from rgbt.utils import serial_process, IoU, CLE, normalize_CLE, batch_IoU, batch_CLE, batch_normalize_CLE, threshold_counts
+from rgbt.utils import load_text, load_text_numpy, parse_boxes, BoxFileError
+
+
+FRAMES = 20000
+
+
+def random_boxes(rng, n, dtype):
+    """
+    Boxes with lost targets, degenerate and NaN boxes and sub-pixel boxes.
+    """
+    boxes = rng.integers(-20, 1280, (n, 4)).astype(dtype)
+    boxes[:, 2:] = rng.integers(-5, 400, (n, 2))
+    boxes[rng.random(n)<0.01] = 0
+    boxes[rng.random(n)<0.005, 2] = np.nan
+    boxes[rng.random(n)<0.05] += rng.random((1, 4)).astype(dtype)
+    return boxes
+
+
+def same_bits(a, b):
+    a, b = np.asarray(a), np.asarray(b)
+    return a.dtype==b.dtype and a.shape==b.shape and a.tobytes()==b.tobytes()
+
+
+@pytest.fixture(params=[np.float32, np.float64], ids=['float32', 'float64'])
+def boxes(request):
+    rng = np.random.default_rng(0)
+    return random_boxes(rng, FRAMES, request.param), random_boxes(rng, FRAMES, request.param)
+
+
+def cases(rect1, rect2):
+    return {'same length': (rect1, rect2), 'shorter result': (rect1[:FRAMES//2], rect2), 'one frame': (rect1[:1], rect2[:1])}
+
+
+@pytest.fixture(autouse=True)
+def no_runtime_warnings():
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        yield
+
+
+@pytest.mark.parametrize('strict', [False, True], ids=['loose', 'strict'])
+def test_iou_kernel_matches_serial_process(boxes, strict, monkeypatch):
+    monkeypatch.setattr(utils, '_strict', strict)
+    for name, (rect1, rect2) in cases(*boxes).items():
+        assert same_bits(np.array(serial_process(IoU, rect1, rect2)), batch_IoU(rect1, rect2)), name
+        assert same_bits(np.array(serial_process(IoU, rect1, rect2)), batch_IoU(rect1, rect2, strict=strict)), name
+
+
+@pytest.mark.parametrize('strict', [False, True], ids=['loose', 'strict'])
+@pytest.mark.parametrize('fun, kernel', [(CLE, batch_CLE), (normalize_CLE, batch_normalize_CLE)], ids=['CLE', 'normalize_CLE'])
+def test_distance_kernel_matches_serial_process(boxes, fun, kernel, strict, monkeypatch):
+    # the per-box functions take the square root with `**0.5`, the kernels with np.sqrt:
+    # equal to within 2 ulp, NaN where the per-box value is NaN
+    monkeypatch.setattr(utils, '_strict', strict)
+    for name, (rect1, rect2) in cases(*boxes).items():
+        expected = np.array(serial_process(fun, rect1, rect2))
+        for values in (kernel(rect1, rect2), kernel(rect1, rect2, strict=strict)):
+            assert values.dtype==expected.dtype and values.shape==expected.shape, name
+            np.testing.assert_allclose(values, expected, rtol=2*np.finfo(expected.dtype).eps, atol=0, equal_nan=True, err_msg=name)
+
+
+@pytest.mark.parametrize('op, compare', [('<=', np.less_equal), ('<', np.less), ('>', np.greater)], ids=['le', 'lt', 'gt'])
+@pytest.mark.parametrize('thr', [np.linspace(0, 50, 51), np.linspace(0, 1000, 1001)[::-1], [0.5*i for i in range(51)]],
+                         ids=['sorted', 'reversed', 'list'])
+def test_threshold_counts_match_loop(boxes, thr, op, compare):
+    for name, (rect1, rect2) in cases(*boxes).items():
+        values = batch_CLE(rect1, rect2)
+        values[::97] = -1
+        offsets = [0, len(values)//3, len(values)//3, len(values)]
+        loop = np.array([np.sum(compare(values, t)) for t in thr])
+        per_seq = np.array([[np.sum(compare(values[a:b], t)) for t in thr] for a, b in zip(offsets[:-1], offsets[1:])])
+        assert np.array_equal(loop, threshold_counts(values, thr, op)), name
+        assert np.array_equal(per_seq, threshold_counts(values, thr, op, offsets)), name
+
+
+def lasher_loop(serial, gt):
+    serial = serial[:len(gt)].copy()
+    for i in range(1, len(gt)):
+        if serial[i][2]<=0 or serial[i][3]<=0:
+            serial[i] = serial[i-1].copy()
+    return serial
+
+
+def test_lasher_boxes_match_loop(boxes):
+    rect1, rect2 = boxes
+    assert same_bits(lasher_loop(rect1, rect2), lasher_boxes(rect1, rect2))
+    assert same_bits(lasher_loop(rect1[:1], rect2[:1]), lasher_boxes(rect1[:1], rect2[:1]))
+    assert lasher_boxes(rect1[:0], rect2).shape==(0, 4)
+
+
+@pytest.mark.parametrize('sep', [',', ' ', '\t'], ids=['comma', 'space', 'tab'])
+def test_load_text_matches_delimiter_loop(tmp_path, sep):
+    rng = np.random.default_rng(1)
+    boxes = rng.integers(-5, 1000, (50, 4)).astype(np.float32) + rng.random((50, 4)).round(3).astype(np.float32)
+    path = tmp_path/'seq.txt'
+    path.write_text('\n'.join(sep.join(f'{v:g}' for v in box) for box in boxes)+'\n')
+    expected = load_text_numpy(str(path), delimiter=[',', ' ', '\t'], dtype=np.float32)
+    assert same_bits(load_text(str(path)), expected)
+
+
+def test_parse_boxes_trailing_delimiters_and_mixed_whitespace():
+    assert np.array_equal(parse_boxes(['1,2,3,4,', '5,6,7,8, ', '9,10,11,12']), [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12]])
+    assert np.array_equal(parse_boxes(['1 2\t3  4', '5\t\t6 7 8 ']), [[1, 2, 3, 4], [5, 6, 7, 8]])
+    assert np.array_equal(parse_boxes(['1, 2, 3, 4', '5 ,6 , 7,8']), [[1, 2, 3, 4], [5, 6, 7, 8]])
+
+
+@pytest.mark.parametrize('lines, lineno', [
+    (['1,2,3,4,', '5,6,7,8,9,'], 2),        # extra column after a trailing delimiter
+    (['1,2,3,4', '5,6,7'], 2),
+    (['1 2 3 4', '', '5 6 7 8 9'], 3),
+    (['1,2,3,4', '5,6,x,8'], 2),
+    (['1,2,,4'], 1),
+], ids=['trailing-extra', 'missing', 'extra-whitespace', 'not-a-number', 'empty-field'])
+def test_parse_boxes_malformed_rows(lines, lineno):
+    with pytest.raises(BoxFileError) as err:
+        parse_boxes(lines, 'seq.txt')
+    assert err.value.path=='seq.txt' and err.value.lineno==lineno and err.value.line==lines[lineno-1]
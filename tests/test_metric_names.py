@@ -0,0 +1,20 @@
+"""
+The metrics of a dataset are selected by one name or a list of names.
+"""
+import pytest
+from rgbt import GTOT, LasHeR
+from rgbt.metrics.compact import dataset_metrics
+
+
+@pytest.mark.parametrize('names, selected', [(None, ['MPR', 'MSR']), ('MSR', ['MSR']), (['MSR', 'MPR'], ['MSR', 'MPR'])])
+def test_dataset_metrics_by_name(names, selected):
+    assert list(dataset_metrics(GTOT(), names))==selected
+
+
+def test_stream_takes_a_single_name():
+    assert list(LasHeR().stream('PR').metrics)==['PR']
+
+
+def test_unknown_metric_is_reported():
+    with pytest.raises(ValueError, match='Unknown metric: NPR'):
+        GTOT().stream(['MPR', 'NPR'])
@@ -0,0 +1,26 @@
+"""
+The value of `Metric.reduce` splits over the sequences as `Metric.seq_terms` says.
+"""
+import numpy as np
+import pytest
+from rgbt.metrics import metrics
+
+
+METRICS = [metrics.MPR, metrics.MSR, metrics.MPR_GTOT, metrics.MSR_GTOT, metrics.PR, metrics.SR,
+           metrics.SR_LasHeR, metrics.PR_LasHeR, metrics.NPR]
+
+
+@pytest.mark.parametrize('Metric', METRICS, ids=lambda m: m.__name__)
+def test_seq_terms_sum_to_reduce(Metric):
+    metric = Metric()
+    rng = np.random.default_rng(0)
+    frames = rng.integers(50, 500, 12)
+    counts = np.sort(rng.integers(0, frames[:, None]+1, (12, len(metric.thr))), axis=1)
+    value, curve = metric.reduce(counts, frames)
+    num, den = metric.seq_terms(counts, frames)
+    assert curve.shape==counts.shape
+    assert np.isclose(num.sum()/den.sum(), value, rtol=1e-12)
+    # leading axes, e.g. trackers
+    num2, den2 = metric.seq_terms(np.stack([counts, counts]), np.stack([frames, frames]))
+    np.testing.assert_array_equal(num2[1], num)
+    np.testing.assert_array_equal(den2[1], den)
@@ -0,0 +1,28 @@
+"""
+Result sources: extension choice and error reporting of `DirectorySource`.
+"""
+import os
+import numpy as np
+import pytest
+from rgbt.dataset.result_source import DirectorySource, ResultLoadError
+
+
+def test_extension_priority_does_not_depend_on_listdir(tmp_path, monkeypatch):
+    np.save(tmp_path/'seq.npy', np.zeros((2, 4)))
+    (tmp_path/'seq.txt').write_text('1,2,3,4\n5,6,7,8\n')
+    listdir = os.listdir
+    for order in (sorted, lambda names: sorted(names, reverse=True)):
+        monkeypatch.setattr(os, 'listdir', lambda path: order(listdir(path)))
+        source = DirectorySource(str(tmp_path))
+        assert source.file_path('seq').endswith('seq.txt')
+        np.testing.assert_array_equal(source.read(['seq'])['seq'], [[1, 2, 3, 4], [5, 6, 7, 8]])
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_serial_and_pooled_reads_collect_all_errors(tmp_path, workers):
+    (tmp_path/'good.txt').write_text('1,2,3,4\n')
+    (tmp_path/'nan.txt').write_text('1,2,x,4\n')
+    (tmp_path/'cols.txt').write_text('1,2,3,4\n1,2,3\n')
+    with pytest.raises(ResultLoadError) as info:
+        DirectorySource(str(tmp_path)).read(['good', 'nan', 'cols'], workers)
+    assert sorted(os.path.basename(p) for p in info.value.errors) == ['cols.txt', 'nan.txt']